@@ -13,6 +13,7 @@ from bugwarrior.config import (
 from bugwarrior.services import aggregate_issues, get_service
 from bugwarrior.db import (
     get_defined_udas_as_strings,
+    get_defined_udas_as_taskrc,
     synchronize,
 )
 
@@ -152,9 +153,14 @@ def set(target, username):
 
 @click.command()
 @click.option('--flavor', default=None, help='The flavor to use')
-def uda(flavor):
+@click.option('--include', is_flag=True,
+              help='Write the UDAs to a file and print a line including it')
+def uda(flavor, include):
     main_section = _get_section_name(flavor)
     conf = _try_load_config(main_section)
+    if include:
+        print("include %s" % get_defined_udas_as_taskrc(conf, main_section))
+        return
     print("# Bugwarrior UDAs")
     for uda in get_defined_udas_as_strings(conf, main_section):
         print(uda)
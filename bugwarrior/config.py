@@ -2,6 +2,7 @@ from future import standard_library
 standard_library.install_aliases()
 import codecs
 from six.moves import configparser
+import json
 import os
 import subprocess
 import sys
@@ -19,6 +20,12 @@ from bugwarrior.data import BugwarriorData
 # to the bugwarriorrc file
 BUGWARRIORRC = "BUGWARRIORRC"
 
+# Where bugwarrior can read existing tasks from, see bugwarrior.taskstore.
+TASK_STORES = ('auto', 'export', 'files', 'taskchampion')
+
+# How targets can be run concurrently, see bugwarrior.services.aggregate_issues.
+WORKER_BACKENDS = ('process', 'thread')
+
 
 def asbool(some_value):
     """ Cast config values to boolean. """
@@ -27,9 +34,13 @@ def asbool(some_value):
     ]
 
 
+# Commas separate list items, except within template expressions.
+LIST_SEPARATOR = re.compile(",(?![^{]*})")
+
+
 def aslist(value):
     """ Cast config values to lists of strings """
-    return [item.strip() for item in re.split(",(?![^{]*})",value.strip())]
+    return [item.strip() for item in LIST_SEPARATOR.split(value.strip())]
 
 
 def asint(value):
@@ -101,6 +112,37 @@ def get_service_password(service, username, oracle=None, interactive=False):
     return password
 
 
+class CredentialBroker(object):
+    """ Resolve passwords once per (service, username) and remember them.
+
+    Looking a password up may ask the keyring, gpg-agent or the user, or run
+    an arbitrary command.  The parent process resolves the passwords all
+    targets need before starting its workers (see
+    :func:`bugwarrior.services.prefetch_passwords`), and the workers then
+    inherit them with the configuration (see :func:`get_credential_broker`).
+    """
+    def __init__(self):
+        self.passwords = {}
+
+    def get_password(self, service, username, oracle=None, interactive=False):
+        """ Same as :func:`get_service_password`, but memoized. """
+        key = (service, username, oracle)
+        if key not in self.passwords:
+            self.passwords[key] = get_service_password(
+                service, username, oracle, interactive=interactive)
+        return self.passwords[key]
+
+
+def get_credential_broker(config):
+    """ Return the :class:`CredentialBroker` of `config`, adding one if need be.
+    """
+    try:
+        return config.credentials
+    except AttributeError:
+        config.credentials = CredentialBroker()
+        return config.credentials
+
+
 def oracle_eval(command):
     """ Retrieve password from the given command """
     p = subprocess.Popen(
@@ -164,6 +206,18 @@ def validate_config(config, main_section):
     if not config.has_option(main_section, 'targets'):
         die("No targets= item in [%s] found." % main_section)
 
+    if config.has_option(main_section, 'worker_backend'):
+        worker_backend = config.get(main_section, 'worker_backend')
+        if worker_backend not in WORKER_BACKENDS:
+            die("worker_backend= must be one of %s, not %r." % (
+                ', '.join(WORKER_BACKENDS), worker_backend))
+
+    if config.has_option(main_section, 'task_store'):
+        task_store = config.get(main_section, 'task_store')
+        if task_store not in TASK_STORES:
+            die("task_store= must be one of %s, not %r." % (
+                ', '.join(TASK_STORES), task_store))
+
     targets = aslist(config.get(main_section, 'targets'))
     targets = [t for t in targets if len(t)]
 
@@ -249,9 +303,57 @@ def get_taskrc_path(conf, main_section):
     )
 
 
+def get_data_location_cache_path():
+    """ Return the path of the file remembering taskrc data locations. """
+    return os.path.join(
+        os.path.expanduser(os.getenv('XDG_CACHE_HOME', '~/.cache')),
+        'bugwarrior', 'data-locations.json')
+
+
 def get_data_path(config, main_section):
+    """ Return the data location of the taskrc bugwarrior uses.
+
+    Asking taskwarrior for it means forking ``task``, so the answer is
+    remembered along with the modification time and size of the taskrc and
+    the value of ``$TASKDATA``.  Changes to files included by the taskrc
+    aren't noticed: touch the taskrc after changing them.
+    """
     taskrc = get_taskrc_path(config, main_section)
 
+    if not os.path.isfile(taskrc):
+        raise IOError('Unable to find taskrc file.')
+
+    stat = os.stat(taskrc)
+    key = [stat.st_mtime_ns, stat.st_size, os.environ.get('TASKDATA')]
+
+    cache_path = get_data_location_cache_path()
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (IOError, ValueError):
+        cache = {}
+
+    entry = cache.get(taskrc)
+    if entry and entry['key'] == key:
+        data_path = entry['data_location']
+    else:
+        data_path = get_taskrc_data_location(taskrc)
+        cache[taskrc] = {'key': key, 'data_location': data_path}
+        try:
+            if not os.path.isdir(os.path.dirname(cache_path)):
+                os.makedirs(os.path.dirname(cache_path))
+            tmp_path = '%s.%i' % (cache_path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f)
+            os.rename(tmp_path, cache_path)
+        except (IOError, OSError) as e:
+            log.debug("Unable to remember the data location: %s", e)
+
+    return os.path.normpath(os.path.expanduser(data_path))
+
+
+def get_taskrc_data_location(taskrc):
+    """ Ask taskwarrior for the data location of `taskrc`. """
     # We cannot use the taskw module here because it doesn't really support
     # the `_` subcommands properly (`rc:` can't be used for them).
     line_prefix = 'data.location='
@@ -260,9 +362,6 @@ def get_data_path(config, main_section):
     env = dict(os.environ)
     env['TASKRC'] = taskrc
 
-    if not os.path.isfile(taskrc):
-        raise IOError('Unable to find taskrc file.')
-
     tw_show = subprocess.Popen(
         ('task', '_show'), stdout=subprocess.PIPE, env=env)
     data_location = subprocess.check_output(
@@ -273,7 +372,7 @@ def get_data_path(config, main_section):
     if not data_path:
         raise IOError('Unable to determine the data location.')
 
-    return os.path.normpath(os.path.expanduser(data_path))
+    return data_path
 
 
 # ConfigParser is not a new-style class, so inherit from object to fix super().
@@ -295,31 +394,58 @@ class BugwarriorConfigParser(configparser.ConfigParser, object):
 
 
 class ServiceConfig(object):
-    """ A service-aware wrapper for ConfigParser objects. """
+    """ A service-aware wrapper for ConfigParser objects.
+
+    Options are looked up (and interpolated) only once: services read the
+    configuration of their target while it is being pulled, during which
+    it doesn't change.
+    """
+    # Marks options which aren't set in `values`.
+    MISSING = object()
+
     def __init__(self, config_prefix, config_parser, service_target):
         self.config_prefix = config_prefix
         self.config_parser = config_parser
         self.service_target = service_target
+        self.values = {}
 
     def __getattr__(self, name):
         """ Proxy undefined attributes/methods to ConfigParser object. """
+        if name in ('config_parser', 'values'):
+            # Not set yet, e.g. while unpickling.
+            raise AttributeError(name)
         return getattr(self.config_parser, name)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # MISSING is not the same object once unpickled.
+        state['values'] = {}
+        return state
+
     def __contains__(self, key):
         """ Does service section specify this option? """
-        return self.config_parser.has_option(
-            self.service_target, self._get_key(key))
+        return self._get_value(key) is not self.MISSING
 
     def get(self, key, default=None, to_type=None):
-        try:
-            value = self.config_parser.get(self.service_target, self._get_key(key))
-            if to_type:
-                return to_type(value)
-            return value
-        except configparser.NoSectionError:
-            return default
-        except configparser.NoOptionError:
+        value = self._get_value(key)
+        if value is self.MISSING:
             return default
+        if to_type:
+            return to_type(value)
+        return value
+
+    def _get_value(self, key):
+        try:
+            return self.values[key]
+        except KeyError:
+            pass
+        try:
+            value = self.config_parser.get(
+                self.service_target, self._get_key(key))
+        except (configparser.NoSectionError, configparser.NoOptionError):
+            value = self.MISSING
+        self.values[key] = value
+        return value
 
     def _get_key(self, key):
         return '%s.%s' % (self.config_prefix, key)
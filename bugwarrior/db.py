@@ -4,20 +4,26 @@ standard_library.install_aliases()
 from builtins import zip
 from builtins import object
 
+from six.moves import queue
 from six.moves.configparser import NoOptionError, NoSectionError
+import bisect
+import codecs
+import collections
+import datetime
+import hashlib
 import json
 import os
 import re
 import subprocess
 import sys
+import threading
+import uuid
 
-import requests
-import dogpile.cache
 import six
-from taskw import TaskWarriorShellout
-from taskw.exceptions import TaskwarriorError
 
-from bugwarrior.config import asbool, get_taskrc_path, aslist
+from bugwarrior import taskstore
+from bugwarrior.config import (
+    asbool, asint, aslist, get_data_path, get_taskrc_path)
 from bugwarrior.notifications import send_notification
 
 import logging
@@ -26,6 +32,19 @@ log = logging.getLogger(__name__)
 
 MARKUP = "(bw)"
 
+# How many tasks to hand to a single ``task import`` invocation.
+DEFAULT_IMPORT_BATCH_SIZE = 500
+
+# Sentinels for the background importer's queue.
+_FLUSH = object()
+_STOP = object()
+
+# Hidden UDA holding a hash of the upstream issue as of the last write.
+FINGERPRINT = 'bwfingerprint'
+
+# Where the task index is kept between runs, within the data location.
+INDEX_FILE = 'bugwarrior-index.json'
+
 # In Python 2.3 through 2.7, the stdlib dbm module include a berkeley db
 # interface, which was used by default by dogpile.cache.  In Python3, the
 # berkeley db module was removed which means that cache files created by
@@ -37,12 +56,41 @@ PYVER = '%i.%i' % sys.version_info[:2]
 DOGPILE_CACHE_PATH = os.path.expanduser(''.join([
     os.getenv('XDG_CACHE_HOME', '~/.cache'), '/dagd-py', PYVER, '.dbm']))
 
-if not os.path.isdir(os.path.dirname(DOGPILE_CACHE_PATH)):
-    os.makedirs(os.path.dirname(DOGPILE_CACHE_PATH))
-CACHE_REGION = dogpile.cache.make_region().configure(
-    "dogpile.cache.dbm",
-    arguments=dict(filename=DOGPILE_CACHE_PATH),
-)
+
+_cache_region = None
+
+
+def get_cache_region():
+    """ Return the dogpile cache region, configuring it on first use. """
+    global _cache_region
+    if _cache_region is None:
+        import dogpile.cache
+        if not os.path.isdir(os.path.dirname(DOGPILE_CACHE_PATH)):
+            os.makedirs(os.path.dirname(DOGPILE_CACHE_PATH))
+        _cache_region = dogpile.cache.make_region().configure(
+            "dogpile.cache.dbm",
+            arguments=dict(filename=DOGPILE_CACHE_PATH),
+        )
+    return _cache_region
+
+
+class LazyCacheRegion(object):
+    """ Stands for the cache region until it is used, then for what
+    :func:`get_cache_region` returns. """
+
+    def __getattr__(self, name):
+        return getattr(get_cache_region(), name)
+
+
+# CACHE_REGION used to be configured on import; services outside of
+# bugwarrior may still use it.
+CACHE_REGION = LazyCacheRegion()
+
+
+def serialize_date(value):
+    """ Serialize a date the way taskwarrior stores it. """
+    from taskw.fields import DateField
+    return DateField().serialize(value)
 
 
 class URLShortener(object):
@@ -55,12 +103,18 @@ class URLShortener(object):
             )
         return cls._instance
 
-    @CACHE_REGION.cache_on_arguments()
     def shorten(self, url):
+        # Same key as the cache_on_arguments() decorator used to produce.
+        return get_cache_region().get_or_create(
+            'bugwarrior.db:shorten|%s' % url, lambda: self._shorten(url))
+
+    def _shorten(self, url):
+        from bugwarrior import sessions
         if not url:
             return ''
         base = 'https://da.gd/s'
-        return requests.get(base, params=dict(url=url)).text.strip()
+        return sessions.get_session().get(
+            base, params=dict(url=url)).text.strip()
 
 
 class NotFound(Exception):
@@ -98,23 +152,6 @@ def hamdist(str1, str2):
     return diffs
 
 
-def get_managed_task_uuids(tw, key_list):
-    expected_task_ids = set([])
-    for keys in key_list.values():
-        tasks = tw.filter_tasks({
-            'and': [('%s.any' % key, None) for key in keys],
-            'or': [
-                ('status', 'pending'),
-                ('status', 'waiting'),
-            ],
-        })
-        expected_task_ids = expected_task_ids | set([
-            task['uuid'] for task in tasks
-        ])
-
-    return expected_task_ids
-
-
 def make_unique_identifier(keys, issue):
     """ For a given issue, make an identifier from its unique keys.
 
@@ -127,16 +164,272 @@ def make_unique_identifier(keys, issue):
     * `issue`: An instance of a subclass of `bugwarrior.services.Issue`.
 
     :returns:
-    * A single string UUID.
+    * A hashable tuple of the service name and the issue's key values.
     """
     for service, key_list in six.iteritems(keys):
         if all([key in issue for key in key_list]):
-            subset = dict([(key, issue[key]) for key in key_list])
-            return json.dumps(subset, sort_keys=True)
+            return (service,) + tuple(issue[key] for key in key_list)
     raise RuntimeError("Could not determine unique identifier for %s" % issue)
 
 
-def find_taskwarrior_uuid(tw, keys, issue):
+class UniqueIdentifier(object):
+    """ Make unique identifiers for issues, remembering the service per class.
+
+    Every issue of a given ``ISSUE_CLASS`` is identified by the same key
+    list, so only the first issue of each class needs to search `keys` for
+    it; later ones only pick out their key values.
+
+    :params:
+    * `keys`: A dictionary mapping service names to their unique key lists,
+      as returned by :func:`build_key_list`.
+
+    """
+    def __init__(self, keys):
+        self.keys = keys
+        self.services = {}
+
+    def __call__(self, issue_class, issue):
+        """ Return the identifier of `issue`, an instance of `issue_class`.
+
+        `issue` may be a plain dictionary copy of the issue, which is much
+        cheaper to query than the issue itself.
+        """
+        service = self.services.get(issue_class)
+        if service is not None:
+            key_list = self.keys[service]
+            if all([key in issue for key in key_list]):
+                return (service,) + tuple(issue[key] for key in key_list)
+
+        identifier = make_unique_identifier(self.keys, issue)
+        self.services[issue_class] = identifier[0]
+        return identifier
+
+
+def get_issue_fingerprint(issue, salt=None):
+    """ Return a stable hash of a refined upstream issue.
+
+    The hash is stored on the task in the :data:`FINGERPRINT` UDA.  When an
+    incoming issue hashes to the value already stored, nothing changed
+    upstream and the issue need not be merged into its task at all.
+
+    :params:
+    * `issue`: The issue dictionary, before any local fields are dropped.
+    * `salt`: Settings which influence how issues are merged into tasks, so
+      that changing them invalidates every fingerprint.
+
+    """
+    return hashlib.sha1(json.dumps(
+        [issue, salt], sort_keys=True, default=six.text_type,
+    ).encode('utf-8')).hexdigest()
+
+
+def get_index_value(value):
+    """ Normalize a field value so that issues and tasks compare equal.
+
+    Taskwarrior hands numeric UDAs back as JSON numbers, which may be
+    floats even when the issue carried an integer.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class TaskIndex(object):
+    """ An in-memory index of existing tasks keyed by unique identifiers.
+
+    Matching every incoming issue with its own ``task`` invocation forks
+    taskwarrior once (or more) per issue.  Instead, take a single snapshot
+    of pending, waiting and completed tasks up front and answer all lookups
+    from memory.
+
+    :params:
+    * `keys`: A dictionary mapping service names to their unique key lists,
+      as returned by :func:`build_key_list`.
+    * `records`: An iterable of tasks as exported by ``task export``.
+    * `udas`: UDA field definitions used to marshal records into
+      `taskw.task.Task` objects (see `taskw.taskrc.TaskRc.get_udas`).
+    * `tw`: If given, `records` only carry the attributes needed for
+      matching, and whole tasks are exported from this
+      `taskw.TaskWarriorShellout` when asked for.
+
+    """
+    STATUSES = ('pending', 'waiting', 'completed')
+
+    def __init__(self, keys, records, udas=None, tw=None):
+        self.keys = keys
+        self.udas = udas or {}
+        self.tw = tw
+        self.tasks = {}
+        self.by_key = dict((service, {}) for service in keys)
+
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_taskwarrior(cls, tw, keys):
+        """ Build an index from a single ``task export``. """
+        query = '( %s )' % ' or '.join(
+            'status:%s' % status for status in cls.STATUSES)
+        records = json.loads(tw._execute(query, 'export')[0])
+        log.debug("Indexed %i existing tasks.", len(records))
+        return cls(keys, records, udas=tw.config.get_udas())
+
+    @classmethod
+    def from_task_store(cls, tw, keys, read, *args, **kwargs):
+        """ Build an index from tasks read directly from the data location.
+
+        Only the unique keys and the :data:`FINGERPRINT` are read.
+
+        :params:
+        * `read`: One of :func:`bugwarrior.taskstore.read_tasks` or
+          :func:`bugwarrior.taskstore.read_taskchampion_tasks`, which is
+          passed `args` and `kwargs`.
+
+        """
+        from taskw.fields import NumericField
+        udas = tw.config.get_udas()
+        fields = get_index_fields(keys)
+        numeric = set([
+            name for name, field in six.iteritems(udas)
+            if isinstance(field, NumericField)
+        ])
+        index = cls(keys, read(
+            fields=fields, numeric=numeric, *args, **kwargs
+        ), udas=udas, tw=tw)
+        log.debug("Indexed %i existing tasks.", len(index.tasks))
+        return index
+
+    @classmethod
+    def from_data_files(cls, tw, keys, data_path, use_mmap=False):
+        """ Build an index from Taskwarrior 2.x data files in `data_path`.
+        """
+        return cls.from_task_store(
+            tw, keys, taskstore.read_tasks, data_path, use_mmap=use_mmap)
+
+    @classmethod
+    def from_taskchampion(cls, tw, keys, data_path):
+        """ Build an index from the TaskChampion replica in `data_path`. """
+        return cls.from_task_store(
+            tw, keys, taskstore.read_taskchampion_tasks, data_path)
+
+    @classmethod
+    def load(cls, tw, keys, path, signature):
+        """ Return the index saved at `path`, or None if it is outdated.
+
+        :params:
+        * `signature`: As returned by :func:`get_index_signature`; the
+          index is only loaded if it was saved with the same signature.
+
+        """
+        try:
+            with open(path, 'r') as handle:
+                data = json.load(handle)
+        except (IOError, ValueError):
+            return None
+        if data.get('signature') != signature:
+            log.debug("Ignoring outdated task index %s.", path)
+            return None
+        index = cls(
+            keys, data['records'], udas=tw.config.get_udas(), tw=tw)
+        log.debug("Loaded %i existing tasks from %s.", len(index.tasks), path)
+        return index
+
+    def save(self, path, signature):
+        """ Save the index to `path`, keeping only what matching needs. """
+        fields = get_index_fields(self.keys) | set(taskstore.BASE_FIELDS)
+        records = [
+            dict((key, value) for key, value in six.iteritems(record)
+                 if key in fields)
+            for record in six.itervalues(self.tasks)
+        ]
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump({'signature': signature, 'records': records}, handle)
+        os.chmod(temporary, 0o600)
+        os.rename(temporary, path)
+
+    def add(self, record):
+        """ Add (or replace) an exported task record in the index. """
+        if record.get('status') not in self.STATUSES:
+            return
+        uuid = record['uuid']
+        if uuid in self.tasks:
+            self.remove(uuid)
+        self.tasks[uuid] = record
+        for service, key_list in six.iteritems(self.keys):
+            if any([key in record for key in key_list]):
+                self.by_key[service].setdefault(
+                    self._get_key(key_list, record), []).append(uuid)
+
+    def remove(self, uuid):
+        record = self.tasks.pop(uuid)
+        for service, key_list in six.iteritems(self.keys):
+            uuids = self.by_key[service].get(
+                self._get_key(key_list, record), [])
+            if uuid in uuids:
+                uuids.remove(uuid)
+
+    @staticmethod
+    def _get_key(key_list, record):
+        return tuple(get_index_value(record.get(key)) for key in key_list)
+
+    def lookup(self, service, issue):
+        """ Return exported records of `service` matching `issue`. """
+        key_list = self.keys[service]
+        key = tuple(get_index_value(issue[key]) for key in key_list)
+        return [self.tasks[uuid] for uuid in self.by_key[service].get(key, [])]
+
+    def get_record(self, uuid):
+        return self.tasks[uuid]
+
+    def get_managed_uuids(self, keys):
+        """ Return uuids of pending and waiting tasks managed by services.
+
+        A task is managed by a service if it has values for all of the
+        service's unique keys.
+
+        :params:
+        * `keys`: A dictionary mapping service names to their unique key
+          lists, as returned by :func:`build_key_list`.
+
+        """
+        key_lists = list(keys.values())
+        return set([
+            uuid for uuid, record in six.iteritems(self.tasks)
+            if record['status'] in ('pending', 'waiting') and any([
+                all([record.get(key) not in (None, '') for key in key_list])
+                for key_list in key_lists
+            ])
+        ])
+
+    def get_task(self, uuid):
+        """ Return a fresh `taskw.task.Task` for the given uuid. """
+        if self.tw is not None:
+            return self.tw.get_task(uuid=uuid)[1]
+        from taskw.task import Task
+        return Task(self.tasks[uuid], udas=self.udas)
+
+
+def get_index_fields(keys):
+    """ Return the task attributes a :class:`TaskIndex` needs for `keys`. """
+    fields = set([FINGERPRINT])
+    for key_list in keys.values():
+        fields.update(key_list)
+    return fields
+
+
+def get_index_signature(keys, data_path):
+    """ Return the signature under which to save a :class:`TaskIndex`.
+
+    It changes whenever the tasks in `data_path` or the indexed `keys` do.
+    """
+    return [
+        sorted(get_index_fields(keys)),
+        taskstore.get_signature(data_path),
+    ]
+
+
+def find_taskwarrior_uuid(index, keys, issue):
     """ For a given issue issue, find its local taskwarrior UUID.
 
     Assembles a list of task IDs existing in taskwarrior
@@ -144,7 +437,7 @@ def find_taskwarrior_uuid(tw, keys, issue):
     set of supplied unique identifiers (`keys`).
 
     :params:
-    * `tw`: An instance of `taskw.TaskWarriorShellout`
+    * `index`: An instance of `bugwarrior.db.TaskIndex`
     * `keys`: A list of lists of keys to use for uniquely identifying
       an issue.  To clarify the "list of lists" behavior, assume that
       there are two services, one having a single primary key field
@@ -174,27 +467,15 @@ def find_taskwarrior_uuid(tw, keys, issue):
 
     for service, key_list in six.iteritems(keys):
         if any([key in issue for key in key_list]):
-            results = tw.filter_tasks({
-                'and': [("%s.is" % key, issue[key]) for key in key_list],
-                'or': [
-                    ('status', 'pending'),
-                    ('status', 'waiting'),
-                    ('status', 'completed')
-                ],
-            })
+            results = index.lookup(service, issue)
             new_possibilities = set([task['uuid'] for task in results])
             # Previous versions of bugwarrior did not allow for reopening
             # completed tasks, so there could be multiple completed tasks
             # for the same issue if it was closed and reopened before that.
             if len(new_possibilities) > 1 and all(
                     r['status'] == 'completed' for r in results):
-                for r in results[1:]:
-                    for k in key_list:
-                        if r[k] != results[0][k]:
-                            break
-                else:
-                    # All results are completed duplicates.
-                    new_possibilities = set([new_possibilities.pop()])
+                # All results are completed duplicates.
+                new_possibilities = set([results[0]['uuid']])
             possibilities = possibilities | new_possibilities
 
     if len(possibilities) == 1:
@@ -213,6 +494,52 @@ def find_taskwarrior_uuid(tw, keys, issue):
     )
 
 
+class MergeIndex(object):
+    """ Answer "is this value already present?" for merge_left in O(1).
+
+    Exact matches are looked up in a set.  With `hamming`, values also
+    match when, after normalization, they are equal once truncated to the
+    shorter of the two lengths -- that is, when one normalized value is a
+    prefix of the other.  Both directions are answered without comparing
+    every pair: normalized values which are a prefix of the candidate are
+    found by probing the (few) distinct lengths present, and values which
+    the candidate is a prefix of sit right at its insertion point in the
+    sorted list of normalized values.
+    """
+    def __init__(self, values, hamming=False):
+        self.hamming = hamming
+        self.exact = set()
+        self.normalized = set()
+        self.lengths = set()
+        self.sorted = []
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        self.exact.add(value)
+        if self.hamming:
+            normalized = get_normalized_annotation(value)
+            if normalized not in self.normalized:
+                self.normalized.add(normalized)
+                self.lengths.add(len(normalized))
+                bisect.insort(self.sorted, normalized)
+
+    def __contains__(self, value):
+        if value in self.exact:
+            return True
+        if not self.hamming:
+            return False
+
+        normalized = get_normalized_annotation(value)
+        for length in self.lengths:
+            if length <= len(normalized) and \
+                    normalized[:length] in self.normalized:
+                return True
+        position = bisect.bisect_left(self.sorted, normalized)
+        return position < len(self.sorted) and \
+            self.sorted[position].startswith(normalized)
+
+
 def replace_left(field, local_task, remote_issue, keep_items=[]):
     """ Replace array field from the remote_issue to the local_task
 
@@ -229,8 +556,8 @@ def replace_left(field, local_task, remote_issue, keep_items=[]):
     """
 
     # Ensure that empty default are present
-    local_field = local_task.get(field, []).copy()
-    remote_field = remote_issue.get(field, [])
+    local_field = list(local_task.get(field, []))
+    remote_field = list(remote_issue.get(field, []))
 
     # We need to make sure an array exists for this field because
     # we will be appending to it in a moment.
@@ -239,15 +566,37 @@ def replace_left(field, local_task, remote_issue, keep_items=[]):
 
     #Delete all items in local_task, unless they are in keep_items or in remote_issue
     #This ensure that the task is not being updated if there is no changes
+    keep_items = set(keep_items)
+    unmatched = collections.Counter(remote_field)
+    matched = collections.Counter()
+    removed = collections.Counter()
     for item in local_field:
-        if keep_items.count(item) == 0 and remote_field.count(item) == 0:
+        if unmatched[item] > 0:
+            unmatched[item] -= 1
+            matched[item] += 1
+        elif item not in keep_items:
             log.debug('found %s to remove' % (item))
-            local_task[field].remove(item)
-        elif remote_field.count(item) > 0:
-            remote_field.remove(item)
+            removed[item] += 1
+
+    # Removing an item drops its first occurrence, as list.remove() does.
+    if removed:
+        kept = []
+        for item in local_field:
+            if removed[item] > 0:
+                removed[item] -= 1
+            else:
+                kept.append(item)
+        local_task[field][:] = kept
+
+    added = []
+    for item in remote_field:
+        if matched[item] > 0:
+            matched[item] -= 1
+        else:
+            added.append(item)
 
-    if len(remote_field) > 0:
-        local_task[field] += remote_field
+    if len(added) > 0:
+        local_task[field] += added
 
 
 def merge_left(field, local_task, remote_issue, hamming=False):
@@ -276,31 +625,276 @@ def merge_left(field, local_task, remote_issue, hamming=False):
     if field not in local_task:
         local_task[field] = []
 
+    # Remotes are matched against what was appended before them only if
+    # that went into the very list we started from.
+    index = MergeIndex(local_field, hamming=hamming)
+    grows = local_task[field] is local_field
+
     # If a remote does not appear in local, add it to the local task
     new_count = 0
-    for remote in remote_field:
-        for local in local_field:
-            if (
-                # For annotations, they don't have to match *exactly*.
-                (
-                    hamming
-                    and get_annotation_hamming_distance(remote, local) == 0
-                )
-                # But for everything else, they should.
-                or (
-                    remote == local
-                )
-            ):
-                break
-        else:
+    for remote in list(remote_field):
+        if remote not in index:
             log.debug("%s not found in %r" % (remote, local_field))
             local_task[field].append(remote)
             new_count += 1
+            if grows:
+                index.add(remote)
     if new_count > 0:
         log.debug('Added %s new values to %s (total: %s)' % (
             new_count, field, len(local_task[field]),))
 
 
+def get_import_record(task):
+    """ Serialize a task (or a new issue) into ``task import`` JSON.
+
+    ``task import`` replaces an existing task with the imported record
+    wholesale, so this must be called with the complete task.  Fields
+    without a value are dropped rather than sent as ``null``.
+    Annotations which don't carry an entry date yet (newly merged ones)
+    are given unique, increasing entry dates, since taskwarrior keys
+    annotations by their entry date.
+    """
+    record = {}
+    for key, value in six.iteritems(task):
+        if key in ('id', 'urgency') or value is None or value == '' or (
+                key in ('annotations', 'tags', 'depends') and not value):
+            continue
+        if key == 'annotations':
+            value = get_import_annotations(value)
+        elif key == 'depends':
+            value = ','.join(six.text_type(v) for v in value)
+        elif isinstance(value, datetime.date):
+            value = serialize_date(value)
+        elif isinstance(value, uuid.UUID):
+            value = six.text_type(value)
+        record[key] = value
+
+    # New issues are pending, unless they are closed upstream already.
+    # The status is set explicitly so the record can go into a TaskIndex.
+    record.setdefault('status', 'pending')
+    if record.get('end') and record['status'] in ['pending', 'waiting']:
+        record['status'] = 'completed'
+    return record
+
+
+def get_import_annotations(annotations):
+    entries = [
+        getattr(annotation, 'entry', None) for annotation in annotations]
+    used = set(
+        serialize_date(entry) for entry in entries if entry)
+
+    import pytz
+    timestamp = datetime.datetime.now(pytz.utc).replace(microsecond=0)
+    records = []
+    for annotation, entry in zip(annotations, entries):
+        if entry:
+            entry = serialize_date(entry)
+        else:
+            entry = serialize_date(timestamp)
+            while entry in used:
+                timestamp += datetime.timedelta(seconds=1)
+                entry = serialize_date(timestamp)
+            used.add(entry)
+        records.append({
+            'entry': entry,
+            'description': six.text_type(annotation),
+        })
+    return records
+
+
+class TaskImporter(object):
+    """ Write new, changed and completed tasks through ``task import``.
+
+    Every ``task add``, ``task modify`` or ``task done`` is its own
+    process which recomputes the working set and runs hooks; long
+    UDA values may also exceed the maximum command line length.  Instead,
+    queue up complete task records and feed them to taskwarrior as a JSON
+    array on stdin, `batch_size` tasks at a time.
+
+    New tasks are given a UUID up front so the caller can track them
+    without parsing taskwarrior's output.  If a batch is rejected, its
+    tasks are retried one by one so that errors can be reported per task;
+    the UUIDs of tasks which could not be written are kept in `failed`,
+    and the records of those which were in `imported`.
+
+    """
+    def __init__(self, tw, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+        self.tw = tw
+        self.batch_size = batch_size
+        self.batch = []
+        self.failed = {}
+        self.imported = []
+
+    def add(self, task):
+        """ Queue a task for import and return its UUID. """
+        record = get_import_record(task)
+        record.setdefault('uuid', six.text_type(uuid.uuid4()))
+        self.batch.append(record)
+        if self.batch_size and len(self.batch) >= self.batch_size:
+            self.flush()
+        return record['uuid']
+
+    def flush(self):
+        from taskw.exceptions import TaskwarriorError
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+
+        try:
+            self._import(batch)
+            self.imported.extend(batch)
+            return
+        except TaskwarriorError as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+            log.warning(
+                "Unable to import %i tasks at once, retrying one by one: %s",
+                len(batch), e.stderr)
+
+        for record in batch:
+            try:
+                self._import([record])
+                self.imported.append(record)
+            except TaskwarriorError as e:
+                self._fail(record, e)
+
+    def close(self):
+        self.flush()
+
+    def _fail(self, record, error):
+        log.error(
+            "Unable to write task %s %s: %s",
+            record['uuid'], record.get('description', ''), error.stderr)
+        self.failed[record['uuid']] = error.stderr
+
+    def _import(self, records):
+        from taskw.exceptions import TaskwarriorError
+        command = (
+            ['task']
+            + self.tw.get_configuration_override_args()
+            + ['import']
+        )
+        env = os.environ.copy()
+        env['TASKRC'] = self.tw.config_filename
+
+        proc = subprocess.Popen(
+            command,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, stderr = proc.communicate(
+            json.dumps(records).encode('utf-8'))
+        if proc.returncode != 0:
+            raise TaskwarriorError(
+                command,
+                stderr.decode('utf-8', 'replace'),
+                stdout.decode('utf-8', 'replace'),
+                proc.returncode,
+            )
+        log.debug("Imported %i tasks.", len(records))
+
+
+class BackgroundTaskImporter(TaskImporter):
+    """ A :class:`TaskImporter` which writes from a background thread.
+
+    Records handed to :meth:`add` go through a bounded queue to a writer
+    thread, so matching the next issues (and draining the worker queue)
+    continues while ``task import`` runs.  When the queue is full, `add`
+    blocks until the writer catches up.  A partial batch is written once
+    no new records arrived for `flush_interval` seconds, so tasks show up
+    while slow targets are still being fetched.
+
+    Records of batches which could not be written at all are kept in
+    `failed` like the others.  Should the writer thread stop, `add`,
+    `flush` and `close` raise a `RuntimeError` rather than wait for it.
+
+    """
+    def __init__(self, tw, batch_size=DEFAULT_IMPORT_BATCH_SIZE,
+                 max_pending=None, flush_interval=1):
+        super(BackgroundTaskImporter, self).__init__(tw, batch_size)
+        self.flush_interval = flush_interval
+        self.error = None
+        self.queue = queue.Queue(maxsize=max_pending or batch_size or 0)
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def add(self, task):
+        record = get_import_record(task)
+        record.setdefault('uuid', six.text_type(uuid.uuid4()))
+        self._put(record)
+        return record['uuid']
+
+    def flush(self):
+        """ Block until everything queued so far has been written. """
+        self._put(_FLUSH)
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                self._check_writer()
+                self.queue.all_tasks_done.wait(self.flush_interval)
+        if self.error is not None:
+            self._check_writer()
+
+    def close(self):
+        self._put(_STOP)
+        self.thread.join()
+        if self.error is not None:
+            self._check_writer()
+
+    def _check_writer(self):
+        if self.error is not None or not self.thread.is_alive():
+            raise RuntimeError(
+                "The task writer stopped: %r" % (self.error, ))
+
+    def _put(self, item):
+        while True:
+            self._check_writer()
+            try:
+                self.queue.put(item, timeout=self.flush_interval)
+                return
+            except queue.Full:
+                pass
+
+    def _run(self):
+        while self.error is None:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+
+            try:
+                if record is None or record is _FLUSH or record is _STOP:
+                    self._write_batch()
+                else:
+                    self.batch.append(record)
+                    if self.batch_size and len(self.batch) >= self.batch_size:
+                        self._write_batch()
+            except BaseException as e:
+                log.exception("The task writer stopped.")
+                self.error = e
+            finally:
+                if record is not None:
+                    self.queue.task_done()
+
+            if record is _STOP:
+                return
+
+    def _write_batch(self):
+        batch, imported = list(self.batch), len(self.imported)
+        try:
+            TaskImporter.flush(self)
+        except Exception as e:
+            log.exception("Unable to write tasks.")
+            written = set(
+                record['uuid'] for record in self.imported[imported:])
+            for record in batch:
+                if record['uuid'] not in written:
+                    self.failed.setdefault(record['uuid'], six.text_type(e))
+
+
 def run_hooks(conf, name):
     if conf.has_option('hooks', name):
         pre_import = aslist(conf.get('hooks', name))
@@ -315,6 +909,38 @@ def run_hooks(conf, name):
                     raise RuntimeError(msg)
 
 
+def get_data_location(conf, main_section):
+    """ Return the taskwarrior data location. """
+    try:
+        return conf.data.path
+    except AttributeError:  # Configuration not loaded with load_config.
+        return get_data_path(conf, main_section)
+
+
+def get_task_store(conf, main_section):
+    """ Return where to read existing tasks from, and the data location.
+
+    The ``task_store`` option defaults to ``auto``, which reads the
+    TaskChampion replica if the data location has one and otherwise runs
+    ``task export``.
+    """
+    task_store = 'auto'
+    if conf.has_option(main_section, 'task_store'):
+        task_store = conf.get(main_section, 'task_store')
+
+    if task_store == 'export':
+        return task_store, None
+
+    data_path = get_data_location(conf, main_section)
+    if task_store == 'auto':
+        if taskstore.get_taskchampion_path(data_path):
+            task_store = 'taskchampion'
+        else:
+            task_store = 'export'
+
+    return task_store, data_path
+
+
 def synchronize(issue_generator, conf, main_section, dry_run=False):
     def _bool_option(section, option, default):
         try:
@@ -343,9 +969,19 @@ def synchronize(issue_generator, conf, main_section, dry_run=False):
 
     notify = _bool_option('notifications', 'notifications', False) and not dry_run
 
+    if dry_run:
+        # Leave the data location alone.
+        taskrc = get_taskrc_path(conf, main_section)
+        config_overrides = uda_list
+    else:
+        taskrc, config_overrides = get_taskrc_with_udas(
+            get_taskrc_path(conf, main_section), uda_list,
+            get_data_location(conf, main_section), main_section)
+    import pytz
+    from taskw import TaskWarriorShellout
     tw = TaskWarriorShellout(
-        config_filename=get_taskrc_path(conf, main_section),
-        config_overrides=uda_list,
+        config_filename=taskrc,
+        config_overrides=config_overrides,
         marshal=True,
     )
 
@@ -357,14 +993,102 @@ def synchronize(issue_generator, conf, main_section, dry_run=False):
     if conf.has_option(main_section, 'static_tags'):
         static_tags = aslist(conf.get(main_section, 'static_tags'))
 
+    import_batch_size = DEFAULT_IMPORT_BATCH_SIZE
+    if conf.has_option(main_section, 'import_batch_size'):
+        import_batch_size = asint(conf.get(main_section, 'import_batch_size'))
+
+    streaming = _bool_option(main_section, 'streaming', False)
+
+    fingerprint_salt = [
+        static_fields, static_tags, merge_annotations, merge_tags, replace_tags]
+
+    # Reuse the index of the previous run if no task changed since.
+    index = None
+    persist_index = _bool_option(main_section, 'persist_index', False)
+    if persist_index:
+        index_path = os.path.join(
+            get_data_location(conf, main_section), INDEX_FILE)
+        index = TaskIndex.load(tw, key_list, index_path, get_index_signature(
+            key_list, os.path.dirname(index_path)))
+
+    if index is None:
+        task_store, data_path = get_task_store(conf, main_section)
+        log.debug("Reading existing tasks through %s.", task_store)
+        if task_store == 'files':
+            index = TaskIndex.from_data_files(
+                tw, key_list, data_path,
+                use_mmap=_bool_option(main_section, 'task_store.mmap', False))
+        elif task_store == 'taskchampion':
+            index = TaskIndex.from_taskchampion(tw, key_list, data_path)
+        else:
+            index = TaskIndex.from_taskwarrior(tw, key_list)
+
+    notreally = ' (not really)' if dry_run else ''
+    if streaming and not dry_run:
+        importer = BackgroundTaskImporter(tw, batch_size=import_batch_size)
+    else:
+        importer = TaskImporter(tw, batch_size=import_batch_size)
+
+    # Unless streaming, new and changed tasks are collected here and only
+    # written once all targets are done.  Unchanged tasks are only counted.
     issue_updates = {
         'new': [],
-        'existing': [],
         'changed': [],
         'closed': [],
     }
+    counts = {
+        'new': 0,
+        'existing': 0,
+        'changed': 0,
+        'closed': 0,
+    }
+
+    def add_task(issue):
+        counts['new'] += 1
+        log.info(u"Adding task %s%s", issue['description'], notreally)
+
+        if dry_run:
+            return
+        if notify:
+            send_notification(issue, 'Created', conf)
+
+        seen_uuids.add(importer.add(issue))
+
+    def update_task(task):
+        counts['changed'] += 1
+        changes = '; '.join([
+            '{field}: {f} -> {t}'.format(
+                field=field,
+                f=repr(ch[0]),
+                t=repr(ch[1])
+            )
+            for field, ch in six.iteritems(task.get_changes(keep=True))
+        ])
+        log.info(
+            "Updating task %s, %s; %s%s",
+            six.text_type(task['uuid']),
+            task['description'],
+            changes,
+            notreally
+        )
+        if dry_run:
+            return
+
+        importer.add(task)
+
+    writers = {
+        'new': add_task,
+        'changed': update_task,
+    }
+
+    def queue_update(kind, item):
+        if streaming:
+            writers[kind](item)
+        else:
+            issue_updates[kind].append(item)
 
-    seen = []
+    get_unique_identifier = UniqueIdentifier(key_list)
+    seen = set([])
     seen_uuids = set([])
     for issue in issue_generator:
 
@@ -394,15 +1118,28 @@ def synchronize(issue_generator, conf, main_section, dry_run=False):
                 issue_dict['priority'] = None
 
             # De-duplicate issues coming in
-            unique_identifier = make_unique_identifier(key_list, issue)
+            unique_identifier = get_unique_identifier(type(issue), issue_dict)
             if unique_identifier in seen:
                 log.debug("Skipping.  Seen %s of %r" % (unique_identifier, issue))
                 continue
-            seen.append(unique_identifier)
+            seen.add(unique_identifier)
+
+            fingerprint = get_issue_fingerprint(issue_dict, fingerprint_salt)
+            issue_dict[FINGERPRINT] = fingerprint
 
-            existing_taskwarrior_uuid = find_taskwarrior_uuid(tw, key_list, issue)
+            existing_taskwarrior_uuid = find_taskwarrior_uuid(
+                index, key_list, issue)
             seen_uuids.add(existing_taskwarrior_uuid)
-            _, task = tw.get_task(uuid=existing_taskwarrior_uuid)
+
+            # Skip merging altogether if nothing changed upstream since
+            # the last time we wrote this task.
+            record = index.get_record(existing_taskwarrior_uuid)
+            if record.get(FINGERPRINT) == fingerprint and (
+                    record['status'] != 'completed' or issue_dict.get('end')):
+                counts['existing'] += 1
+                continue
+
+            task = index.get_task(existing_taskwarrior_uuid)
 
             if task['status'] == 'completed':
                 # Reopen task
@@ -431,71 +1168,40 @@ def synchronize(issue_generator, conf, main_section, dry_run=False):
             task.update(issue_dict)
 
             if task.get_changes(keep=True):
-                issue_updates['changed'].append(task)
+                queue_update('changed', task)
             else:
-                issue_updates['existing'].append(task)
+                counts['existing'] += 1
 
         except MultipleMatches as e:
             log.exception("Multiple matches: %s", six.text_type(e))
         except NotFound:
-            issue_updates['new'].append(issue_dict)
-
-    notreally = ' (not really)' if dry_run else ''
-    # Add new issues
-    log.info("Adding %i tasks", len(issue_updates['new']))
-    for issue in issue_updates['new']:
-        log.info(u"Adding task %s%s", issue['description'], notreally)
-
-        if dry_run:
-            continue
-        if notify:
-            send_notification(issue, 'Created', conf)
+            queue_update('new', issue_dict)
 
-        try:
-            new_task = tw.task_add(**issue)
-            if 'end' in issue and issue['end']:
-                tw.task_done(uuid=new_task['uuid'])
-        except TaskwarriorError as e:
-            log.exception("Unable to add task: %s" % e.stderr)
-        finally:
-            seen_uuids.add(new_task['uuid'])
+    if not streaming:
+        # Add new issues
+        log.info("Adding %i tasks", len(issue_updates['new']))
+        for issue in issue_updates['new']:
+            add_task(issue)
 
-    log.info("Updating %i tasks", len(issue_updates['changed']))
-    for issue in issue_updates['changed']:
-        changes = '; '.join([
-            '{field}: {f} -> {t}'.format(
-                field=field,
-                f=repr(ch[0]),
-                t=repr(ch[1])
-            )
-            for field, ch in six.iteritems(issue.get_changes(keep=True))
-        ])
-        log.info(
-            "Updating task %s, %s; %s%s",
-            six.text_type(issue['uuid']),
-            issue['description'],
-            changes,
-            notreally
-        )
-        if dry_run:
-            continue
+        log.info("Updating %i tasks", len(issue_updates['changed']))
+        for task in issue_updates['changed']:
+            update_task(task)
+    else:
+        log.info("Added %i tasks", counts['new'])
+        log.info("Updated %i tasks", counts['changed'])
 
-        try:
-            _, updated_task = tw.task_update(issue)
-            if 'end' in issue and issue['end']:
-                tw.task_done(uuid=updated_task['uuid'])
-        except TaskwarriorError as e:
-            log.exception("Unable to modify task: %s" % e.stderr)
+    importer.flush()
 
     log.debug(f'Closing tasks for succeeding services: {targets}.')
-    succeeded_service_task_uuids = get_managed_task_uuids(
-        tw,
-        build_key_list(
-            set([conf.get(target, 'service') for target in targets])))
+    succeeded_services = set([conf.get(target, 'service') for target in targets])
+    succeeded_service_task_uuids = index.get_managed_uuids(dict(
+        (service, keys) for service, keys in six.iteritems(key_list)
+        if service in succeeded_services))
     issue_updates['closed'] = succeeded_service_task_uuids - seen_uuids
+    counts['closed'] = len(issue_updates['closed'])
     log.info("Closing %i tasks", len(issue_updates['closed']))
     for issue in issue_updates['closed']:
-        _, task_info = tw.get_task(uuid=issue)
+        task_info = index.get_task(issue)
         log.info(
             "Completing task %s %s%s",
             issue,
@@ -508,27 +1214,41 @@ def synchronize(issue_generator, conf, main_section, dry_run=False):
         if notify:
             send_notification(task_info, 'Completed', conf)
 
-        try:
-            tw.task_done(uuid=issue)
-        except TaskwarriorError as e:
-            log.exception("Unable to close task: %s" % e.stderr)
+        task_info['status'] = 'completed'
+        task_info['end'] = datetime.datetime.now(pytz.utc)
+        importer.add(task_info)
+
+    importer.close()
+
+    if persist_index and not dry_run:
+        if importer.failed:
+            # The index can't tell which of those tasks exist; start over.
+            if os.path.exists(index_path):
+                os.remove(index_path)
+        else:
+            for record in importer.imported:
+                index.add(record)
+            index.save(index_path, get_index_signature(
+                key_list, os.path.dirname(index_path)))
 
     # Send notifications
     if notify:
         only_on_new_tasks = _bool_option('notifications', 'only_on_new_tasks', False)
-        if not only_on_new_tasks or len(issue_updates['new']) + len(issue_updates['changed']) + len(issue_updates['closed']) > 0:
+        if not only_on_new_tasks or counts['new'] + counts['changed'] + counts['closed'] > 0:
             send_notification(
                 dict(
                     description="New: %d, Changed: %d, Completed: %d" % (
-                        len(issue_updates['new']),
-                        len(issue_updates['changed']),
-                        len(issue_updates['closed'])
+                        counts['new'],
+                        counts['changed'],
+                        counts['closed'],
                     )
                 ),
                 'bw_finished',
                 conf,
             )
 
+    return counts
+
 
 def build_key_list(targets):
     from bugwarrior.services import get_service
@@ -548,11 +1268,73 @@ def get_defined_udas_as_strings(conf, main_section):
         yield uda
 
 
+def write_taskrc(path, lines):
+    """ Write a taskrc made of `lines` to `path` and return `path`.
+
+    The file is only rewritten if its content changed, and then atomically,
+    so that ``task`` never reads it half-written.
+    """
+    content = '\n'.join(lines) + '\n'
+    try:
+        with codecs.open(path, 'r', 'utf-8') as handle:
+            if handle.read() == content:
+                return path
+    except IOError:  # File does not exist.
+        pass
+    temporary = '%s.%i.tmp' % (path, os.getpid())
+    with codecs.open(temporary, 'w', 'utf-8') as handle:
+        handle.write(content)
+    os.replace(temporary, path)
+    return path
+
+
+def write_uda_taskrc(directory, uda_list, main_section='general'):
+    """ Write the UDAs in `uda_list` to a taskrc file and return its path.
+
+    The file can be included from another taskrc.  It keeps its name as
+    long as `main_section` is the same, so including it keeps working
+    when the UDAs change.
+    """
+    return write_taskrc(
+        os.path.join(directory, 'bugwarrior-%s-udas.taskrc' % main_section),
+        ['# Bugwarrior UDAs'] + sorted(
+            convert_override_args_to_taskrc_settings(uda_list)))
+
+
+def get_defined_udas_as_taskrc(conf, main_section):
+    """ Return the path of a taskrc defining the UDAs bugwarrior uses. """
+    targets = aslist(conf.get(main_section, 'targets'))
+    services = set([conf.get(target, 'service') for target in targets])
+    return write_uda_taskrc(
+        get_data_location(conf, main_section),
+        build_uda_config_overrides(services), main_section)
+
+
+def get_taskrc_with_udas(taskrc, uda_list, directory, main_section='general'):
+    """ Return the taskrc and configuration overrides to run ``task`` with.
+
+    Passing UDAs as overrides puts two ``rc.uda...`` arguments per UDA on
+    the command line of every ``task`` invocation.  Instead, write a taskrc
+    to `directory` which includes `taskrc` followed by the UDAs.  Paths
+    with whitespace can't be included, so they fall back to overrides.
+    """
+    uda_taskrc = write_uda_taskrc(directory, uda_list, main_section)
+    if re.search(r'\s', taskrc + uda_taskrc):
+        return taskrc, uda_list
+    return write_taskrc(
+        os.path.join(directory, 'bugwarrior-%s.taskrc' % main_section), [
+            '# Generated by bugwarrior-pull, do not edit.',
+            'include %s' % taskrc,
+            'include %s' % uda_taskrc,
+        ]), None
+
+
 def build_uda_config_overrides(targets):
     """ Returns a list of UDAs defined by given targets
 
     For all targets in `targets`, build a dictionary of configuration overrides
-    representing the UDAs defined by the passed-in services (`targets`).
+    representing the UDAs defined by the passed-in services (`targets`), in
+    addition to the :data:`FINGERPRINT` UDA bugwarrior itself maintains.
 
     Given a hypothetical situation in which you have two services, the first
     of which defining a UDA named 'serviceAid' ("Service A ID", string) and
@@ -581,7 +1363,12 @@ def build_uda_config_overrides(targets):
 
     from bugwarrior.services import get_service
 
-    targets_udas = {}
+    targets_udas = {
+        FINGERPRINT: {
+            'type': 'string',
+            'label': 'Bugwarrior Fingerprint',
+        },
+    }
     for target in targets:
         targets_udas.update(get_service(target).ISSUE_CLASS.UDAS)
     return {
@@ -0,0 +1,185 @@
+""" Conditional requests, answered from a persistent cache.
+
+Most APIs send an ``ETag`` or ``Last-Modified`` header along with their
+responses, and answer later requests repeating it in ``If-None-Match`` or
+``If-Modified-Since`` with an empty 304 response when nothing changed.
+GitHub doesn't even count those against its rate limit.
+
+The :class:`CachingAdapter` keeps the validators, headers and bodies of such
+responses in a sqlite database, sends the validators along with later
+requests for the same URL and replays the stored response when the server
+answers 304.  Services never see the difference, including when they follow
+the pagination headers of the replayed responses.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from bugwarrior.ratelimit import (
+    RateLimitingAdapter, get_credentials_digest)
+
+log = logging.getLogger(__name__)
+
+CACHE_FILE = 'bugwarrior-http-cache.sqlite3'
+
+# Entries which weren't used for that long, in seconds, are dropped.
+MAX_AGE = 30 * 24 * 60 * 60
+
+# Headers describing the body as it was sent, rather than as it is stored.
+WIRE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class ResponseCache(object):
+    """ The responses stored in the sqlite database at `path`. """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Connections can't be shared between threads, nor survive a fork.
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+                    'headers TEXT, body BLOB, used REAL)')
+                connection.execute(
+                    'DELETE FROM responses WHERE used < ?',
+                    (time.time() - MAX_AGE, ))
+            # Bodies may hold anything the credentials give access to.
+            os.chmod(self.path, 0o600)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def get_key(request):
+        """ Return the key of the response to `request`, which depends on
+        its credentials as a URL may answer differently to different users.
+        """
+        digest = hashlib.sha256(request.url.encode('utf-8'))
+        digest.update(get_credentials_digest(request).encode('ascii'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """ Return the etag, last modification date, headers and body stored
+        at `key`, or None. """
+        try:
+            connection = self._connect()
+            with connection:
+                row = connection.execute(
+                    'SELECT etag, last_modified, headers, body '
+                    'FROM responses WHERE key = ?', (key, )).fetchone()
+                if row is not None:
+                    connection.execute(
+                        'UPDATE responses SET used = ? WHERE key = ?',
+                        (time.time(), key))
+        except sqlite3.Error as e:
+            log.debug("Unable to read the HTTP cache: %s", e)
+            return None
+        return row
+
+    def set(self, key, response):
+        """ Store `response` at `key` if it has a validator. """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        headers = dict(
+            (name, value) for name, value in response.headers.items()
+            if name.lower() not in WIRE_HEADERS)
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO responses '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, etag, last_modified, json.dumps(headers),
+                     sqlite3.Binary(response.content), time.time()))
+        except sqlite3.Error as e:
+            log.debug("Unable to write to the HTTP cache: %s", e)
+
+    def count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class CachingAdapter(RateLimitingAdapter):
+    """ Transport adapter making GET requests conditional on the responses
+    stored in `cache`. """
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super(CachingAdapter, self).__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        cacheable = (
+            request.method == 'GET' and not stream and
+            'If-None-Match' not in request.headers and
+            'If-Modified-Since' not in request.headers)
+        if not cacheable:
+            return super(CachingAdapter, self).send(
+                request, stream=stream, **kwargs)
+
+        key = self.cache.get_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            etag, last_modified = cached[:2]
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if last_modified:
+                request.headers['If-Modified-Since'] = last_modified
+
+        response = super(CachingAdapter, self).send(
+            request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.count(hit=True)
+            return self.replay(cached, response)
+
+        self.cache.count(hit=False)
+        if response.status_code == 200:
+            self.cache.set(key, response)
+        return response
+
+    def replay(self, cached, response):
+        """ Return the stored response `cached`, updated with the headers of
+        the 304 `response`. """
+        headers = CaseInsensitiveDict(json.loads(cached[2]))
+        for name, value in response.headers.items():
+            if name.lower() not in WIRE_HEADERS:
+                headers[name] = value
+
+        replayed = requests.Response()
+        replayed.status_code = 200
+        replayed.reason = 'OK'
+        replayed.headers = headers
+        replayed.encoding = get_encoding_from_headers(headers)
+        replayed._content = bytes(cached[3])
+        # For iter_content() and the like, which read raw unless the content
+        # was consumed already.
+        replayed._content_consumed = True
+        replayed.raw = io.BytesIO(replayed._content)
+        replayed.url = response.url
+        replayed.request = response.request
+        replayed.connection = self
+        replayed.elapsed = response.elapsed
+        return replayed
@@ -0,0 +1,216 @@
+""" Requests scheduled according to the rate limits of servers.
+
+GitHub, GitLab and others tell how many requests are left until their
+limit is reset with ``X-RateLimit-Remaining`` / ``RateLimit-Remaining`` and
+``X-RateLimit-Reset`` / ``RateLimit-Reset`` headers, and how long to wait
+after going over it with ``Retry-After``.
+
+The :class:`RateLimitingAdapter` keeps track of them for each host and set
+of credentials, as each user of a host usually has a quota of their own.
+While plenty of requests are left, up to ``pool_maxsize`` requests are sent
+to a host at once.  Once few are left, they are spread until the reset, one at a
+time.  Requests answered with a rate limit error wait until the server
+allows them again and are sent once more, unless that would take longer
+than ``max_rate_limit_wait`` seconds.  Each process keeps its own account,
+which the headers of the next response bring up to date.
+"""
+import email.utils
+import hashlib
+import logging
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+
+log = logging.getLogger(__name__)
+
+# Below this many requests left, requests are spread until the reset.
+LOW_REMAINING = 50
+
+# How long to wait, in seconds, after a rate limit error saying nothing else.
+DEFAULT_RETRY_AFTER = 60
+
+# How many times to send a request answered with a rate limit error.
+MAX_ATTEMPTS = 3
+
+# Headers identifying who sends the request.
+CREDENTIAL_HEADERS = ('authorization', 'cookie', 'private-token')
+
+
+def get_header(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def get_credentials_digest(request):
+    """ Return a digest of the credentials `request` is sent with. """
+    digest = hashlib.sha256()
+    for header in CREDENTIAL_HEADERS:
+        value = request.headers.get(header, '')
+        if not isinstance(value, bytes):
+            value = value.encode('utf-8')
+        digest.update(b'\0' + value)
+    return digest.hexdigest()
+
+
+def parse_reset(value, now):
+    """ Return when the limit is reset, given either as a timestamp or as a
+    number of seconds. """
+    value = float(value)
+    # Timestamps are much larger than any delay.
+    if value > 1e9:
+        return value
+    return now + value
+
+
+def parse_retry_after(value, now):
+    """ Return when to retry, given either as a number of seconds or as an
+    HTTP date. """
+    try:
+        return now + float(value)
+    except ValueError:
+        date = email.utils.parsedate_tz(value)
+        if date is None:
+            return None
+        return email.utils.mktime_tz(date)
+
+
+class HostLimiter(object):
+    """ The account of the requests sent to a host with some credentials. """
+
+    def __init__(self, max_concurrency, max_wait):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.concurrency = max_concurrency
+        self.in_flight = 0
+        self.remaining = None
+        self.reset = None
+        self.blocked_until = 0
+        self.next_request = 0
+        self.condition = threading.Condition()
+
+    def get_delay(self, now):
+        """ Return how long to wait before sending a request. """
+        delay = max(self.blocked_until, self.next_request) - now
+        if (self.remaining is not None and self.reset is not None and
+                self.remaining - self.in_flight <= 0):
+            delay = max(delay, self.reset - now)
+        return delay
+
+    def acquire(self):
+        """ Wait until a request may be sent, and account for it. """
+        with self.condition:
+            while True:
+                now = time.time()
+                delay = self.get_delay(now)
+                # Past that, let the server answer with an error.
+                if 0 < delay <= self.max_wait:
+                    self.condition.wait(delay)
+                elif self.in_flight >= self.concurrency:
+                    self.condition.wait()
+                else:
+                    break
+            self.in_flight += 1
+            if self.is_low(now):
+                # Spread the requests left until the reset.
+                self.next_request = now + (
+                    (self.reset - now) / max(self.remaining, 1))
+
+    def is_low(self, now):
+        return (
+            self.remaining is not None and self.reset is not None and
+            self.reset > now and self.remaining < LOW_REMAINING)
+
+    def release(self, response):
+        """ Account for `response`, and return when the request may be sent
+        again if it was refused because of the rate limit, or None. """
+        now = time.time()
+        headers = response.headers
+        retry_at = retry_after = None
+        with self.condition:
+            self.in_flight -= 1
+            try:
+                remaining = get_header(
+                    headers, 'X-RateLimit-Remaining', 'RateLimit-Remaining')
+                if remaining is not None:
+                    self.remaining = int(remaining)
+                reset = get_header(
+                    headers, 'X-RateLimit-Reset', 'RateLimit-Reset')
+                if reset is not None:
+                    self.reset = parse_reset(reset, now)
+                retry_after = headers.get('Retry-After')
+                if retry_after is not None:
+                    retry_at = parse_retry_after(retry_after, now)
+            except ValueError as e:
+                log.debug("Unable to read rate limit headers: %s", e)
+
+            limited = response.status_code == 429 or (
+                response.status_code == 403 and
+                (retry_after is not None or self.remaining == 0))
+            if limited:
+                if retry_at is None:
+                    retry_at = self.reset
+                if retry_at is None:
+                    retry_at = now + DEFAULT_RETRY_AFTER
+                self.blocked_until = max(self.blocked_until, retry_at)
+                self.concurrency = max(1, self.concurrency // 2)
+            elif self.is_low(now):
+                self.concurrency = 1
+            elif self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+            self.condition.notify_all()
+
+        return retry_at if limited else None
+
+
+class RateLimitingAdapter(HTTPAdapter):
+    """ Transport adapter scheduling requests according to the rate limits
+    of each host. """
+
+    def __init__(self, max_rate_limit_wait=900, **kwargs):
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.limiters = {}
+        self.limiters_lock = threading.Lock()
+        super(RateLimitingAdapter, self).__init__(**kwargs)
+
+    def get_limiter(self, request):
+        key = (urlparse(request.url).netloc, get_credentials_digest(request))
+        with self.limiters_lock:
+            if key not in self.limiters:
+                self.limiters[key] = HostLimiter(
+                    self._pool_maxsize, self.max_rate_limit_wait)
+            return self.limiters[key]
+
+    def send(self, request, **kwargs):
+        limiter = self.get_limiter(request)
+        attempt = 1
+        while True:
+            limiter.acquire()
+            try:
+                response = super(RateLimitingAdapter, self).send(
+                    request, **kwargs)
+            except BaseException:
+                with limiter.condition:
+                    limiter.in_flight -= 1
+                    limiter.condition.notify_all()
+                raise
+            retry_at = limiter.release(response)
+            if retry_at is None or attempt >= MAX_ATTEMPTS:
+                return response
+
+            delay = retry_at - time.time()
+            if delay > self.max_rate_limit_wait:
+                log.warning(
+                    "Rate limited by %s for %is, longer than "
+                    "http_rate_limit_wait.", urlparse(request.url).netloc,
+                    delay)
+                return response
+            log.info(
+                "Rate limited by %s, waiting %is.",
+                urlparse(request.url).netloc, max(delay, 0))
+            response.close()
+            attempt += 1
@@ -2,22 +2,29 @@ from __future__ import unicode_literals
 from builtins import str
 
 import abc
+import collections
 import copy
+import datetime
+import functools
+import hashlib
 import multiprocessing
+import pickle
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from pkg_resources import iter_entry_points
+try:
+    from importlib.metadata import entry_points
+except ImportError:
+    from importlib_metadata import entry_points
 
-from dateutil.parser import parse as parse_date
-from dateutil.tz import tzlocal
-from jinja2 import Template
-import pytz
 import six
 
-from taskw.task import Task
-
-from bugwarrior.config import asbool, asint, aslist, die, get_service_password, ServiceConfig
-from bugwarrior.db import MARKUP, URLShortener
+from bugwarrior import sessions
+from bugwarrior.config import (
+    asbool, asint, aslist, die, get_credential_broker, ServiceConfig)
+from bugwarrior.db import MARKUP, URLShortener, get_cache_region
 
 import logging
 log = logging.getLogger(__name__)
@@ -31,14 +38,185 @@ SERVICE_FINISHED_ERROR = 1
 # date string to be parsed as if it were in your local timezone
 LOCAL_TIMEZONE = 'LOCAL_TIMEZONE'
 
-def get_service(service_name):
-    epoint = iter_entry_points(group='bugwarrior.service', name=service_name)
+# How long, in seconds, `metadata_cache` keeps results by default.  Not at
+# all: cached lists of repositories, boards or projects would hide the ones
+# created since, so users opt in with the ``metadata_cache_ttl`` option.
+METADATA_CACHE_TTL = 0
+
+# ISO 8601 timestamps as returned by most APIs, e.g. 2019-02-07T16:22:53Z,
+# 2016-06-06T06:07:08.123-0700 or 2018-12-02 12:59:00.  Fractions of a
+# second beyond microseconds are truncated, as dateutil does.
+ISO_8601_DATE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})'
+    r'(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?)?'
+    r'(?:(Z)|([+-])(\d{2}):?(\d{2}))?$')
+
+_tzinfos = {}
+
+def parse_iso_date(date):
+    """ Parse an ISO 8601 timestamp without resorting to dateutil.
+
+    Returns the same datetime as `dateutil.parser.parse` would, or None if
+    `date` isn't in one of the forms matched by :data:`ISO_8601_DATE`.
+    """
+    match = ISO_8601_DATE.match(date)
+    if not match:
+        return None
+    from dateutil.tz import tzoffset, tzutc
+    (year, month, day, hour, minute, second, fraction,
+     utc, sign, offset_hours, offset_minutes) = match.groups()
+
+    tzinfo = None
+    if utc:
+        tzinfo = tzutc()
+    elif sign:
+        offset = int(offset_hours) * 3600 + int(offset_minutes) * 60
+        tzinfo = tzoffset(None, -offset if sign == '-' else offset)
+        if not offset:
+            tzinfo = tzutc()
+
     try:
-        epoint = next(epoint)
-    except StopIteration:
+        return datetime.datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int(fraction.ljust(6, '0')) if fraction else 0,
+            tzinfo=tzinfo)
+    except ValueError:
         return None
 
-    return epoint.load()
+
+def get_tzinfo(timezone):
+    """ Return the tzinfo for a `pytz` timezone name or LOCAL_TIMEZONE.
+
+    Timezones are created once per process and shared by all targets.
+    """
+    try:
+        return _tzinfos[timezone]
+    except KeyError:
+        if timezone == LOCAL_TIMEZONE:
+            from dateutil.tz import tzlocal
+            tzinfo = tzlocal()
+        else:
+            import pytz
+            tzinfo = pytz.timezone(timezone)
+        _tzinfos[timezone] = tzinfo
+        return tzinfo
+
+
+_service_entry_points = None
+_services = {}
+
+
+def get_service_entry_points():
+    """ Return the ``bugwarrior.service`` entry points, by service name.
+
+    Installed distributions are only scanned the first time.
+    """
+    global _service_entry_points
+    if _service_entry_points is None:
+        epoints = entry_points()
+        if hasattr(epoints, 'select'):
+            epoints = epoints.select(group='bugwarrior.service')
+        else:
+            # Python < 3.10 returns a dict of lists.
+            epoints = epoints.get('bugwarrior.service', [])
+        _service_entry_points = {}
+        for epoint in epoints:
+            _service_entry_points.setdefault(epoint.name, epoint)
+    return _service_entry_points
+
+
+def get_service(service_name):
+    """ Return the service class registered as `service_name`, or None.
+
+    The module of a service is only imported once it is asked for.
+    """
+    if service_name not in _services:
+        epoint = get_service_entry_points().get(service_name)
+        if epoint is None:
+            return None
+        _services[service_name] = epoint.load()
+    return _services[service_name]
+
+
+class TemplateCache(object):
+    """ The compiled Jinja templates of a target.
+
+    Field templates, ``add_tags`` and label templates are rendered once per
+    issue, so each source is compiled only the first time it is needed, by
+    an environment shared by all targets.  Compiled templates can't be
+    pickled: an unpickled cache is the cache of the same target in the
+    receiving process (see :func:`get_template_cache`).
+    """
+    environment = None
+
+    def __init__(self, target, sources=()):
+        self.target = target
+        self.compiled = {}
+        for source in sources:
+            self.get(source)
+
+    def get(self, source):
+        """ Return the compiled template for `source`. """
+        try:
+            return self.compiled[source]
+        except KeyError:
+            if TemplateCache.environment is None:
+                import jinja2
+                TemplateCache.environment = jinja2.Environment()
+            template = TemplateCache.environment.from_string(source)
+            self.compiled[source] = template
+            return template
+
+    def render(self, source, *args, **kwargs):
+        return self.get(source).render(*args, **kwargs)
+
+    def __reduce__(self):
+        return (get_template_cache, (self.target, ))
+
+
+_template_caches = {}
+
+
+def get_template_cache(target, sources=()):
+    """ Return the :class:`TemplateCache` of `target`, creating it if need be.
+
+    `sources` are compiled right away.
+    """
+    if target not in _template_caches:
+        _template_caches[target] = TemplateCache(target)
+    cache = _template_caches[target]
+    for source in sources:
+        cache.get(source)
+    return cache
+
+
+def metadata_cache(ttl=METADATA_CACHE_TTL):
+    """ Keep the results of a service method for `ttl` seconds.
+
+    Meant for data which rarely changes, such as the projects or custom
+    fields of an account.  Results are kept in the cache region of
+    :mod:`bugwarrior.db` for each target configuration and list of
+    arguments, so they outlive the run.  The ``metadata_cache_ttl`` option
+    overrides `ttl`, and setting it to 0 disables the cache.  By default,
+    nothing is cached.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            expiration_time = self.metadata_cache_ttl
+            if expiration_time is None:
+                expiration_time = ttl
+            if not expiration_time:
+                return method(self, *args)
+            key = '%s:%s|%s|%r' % (
+                method.__module__, method.__name__,
+                self.get_metadata_cache_key(), args)
+            return get_cache_region().get_or_create(
+                key, lambda: method(self, *args),
+                expiration_time=expiration_time)
+        return wrapper
+    return decorator
 
 
 class IssueService(abc.ABC):
@@ -47,6 +225,9 @@ class IssueService(abc.ABC):
     ISSUE_CLASS = None
     # What prefix should we use for this service's configuration values
     CONFIG_PREFIX = ''
+    # Which options may hold a password (see `get_password`), mapped to the
+    # option holding the username to look it up for, or None for no username.
+    PASSWORD_OPTIONS = {}
 
     def __init__(self, main_config, main_section, target):
         self.config = ServiceConfig(self.CONFIG_PREFIX, main_config, target)
@@ -54,6 +235,8 @@ class IssueService(abc.ABC):
         self.main_config = main_config
         self.target = target
 
+        sessions.configure(main_config, main_section)
+
         self.desc_len = self._get_config_or_default('description_length', 35, asint);
         self.anno_len = self._get_config_or_default('annotation_length', 45, asint);
         self.inline_links = self._get_config_or_default('inline_links', True, asbool);
@@ -70,6 +253,20 @@ class IssueService(abc.ABC):
             if option:
                 self.add_tags.append(option)
 
+        # Read by `include` for every issue.
+        self.only_if_assigned = self.config.get('only_if_assigned', None)
+        self.also_unassigned = self.config.get('also_unassigned', None, asbool)
+        self.only_if_author = self.config.get('only_if_author', None)
+
+        self.metadata_cache_ttl = self._get_target_config_or_default(
+            'metadata_cache_ttl', None, asint)
+        self.annotation_concurrency = self._get_target_config_or_default(
+            'annotation_concurrency', 1, asint) or 1
+
+        self.templates = self.get_templates()
+        self.template_cache = get_template_cache(
+            self.target, list(self.templates.values()) + self.add_tags)
+
         log.info("Working on [%s]", self.target)
 
 
@@ -81,6 +278,47 @@ class IssueService(abc.ABC):
         return default
 
 
+    def _get_target_config_or_default(self, key, default, as_type=lambda x: x):
+        """Return a target config value, else a main config value, or
+        default if neither exists."""
+        value = self.config.get(key, None, as_type)
+        if value is None:
+            value = self._get_config_or_default(key, default, as_type)
+        return value
+
+    def map_concurrently(self, function, iterable):
+        """ Yield `function(item)` for each item of `iterable`, in order.
+
+        Up to ``annotation_concurrency`` items are handled at once, each in
+        its own thread, so that services can fetch the comments of many
+        issues in parallel.  Items are taken from `iterable` as threads
+        become free.
+        """
+        if self.annotation_concurrency <= 1:
+            for item in iterable:
+                yield function(item)
+            return
+
+        with ThreadPoolExecutor(self.annotation_concurrency) as executor:
+            pending = collections.deque()
+            for item in iterable:
+                pending.append(executor.submit(function, item))
+                if len(pending) >= self.annotation_concurrency:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def get_metadata_cache_key(self):
+        """ Return what identifies the results of `metadata_cache` methods
+        of this target.
+
+        They depend on the options of the target, such as its URL and
+        credentials, which are hashed rather than stored as they are.
+        """
+        options = sorted(self.main_config.items(self.target, raw=True))
+        digest = hashlib.sha256(repr(options).encode('utf-8')).hexdigest()
+        return '%s|%s' % (self.target, digest)
+
     def get_templates(self):
         """ Get any defined templates for configuration values.
 
@@ -108,6 +346,7 @@ class IssueService(abc.ABC):
         generated issue was.
 
         """
+        from taskw.task import Task
         templates = {}
         for key in six.iterkeys(Task.FIELDS):
             template_key = '%s_template' % key
@@ -119,7 +358,7 @@ class IssueService(abc.ABC):
         password = self.config.get(key)
         keyring_service = self.get_keyring_service(self.config)
         if not password or password.startswith("@oracle:"):
-            password = get_service_password(
+            password = get_credential_broker(self.main_config).get_password(
                 keyring_service, login, oracle=password,
                 interactive=self.config.interactive)
         return password
@@ -127,19 +366,27 @@ class IssueService(abc.ABC):
     def get_service_metadata(self):
         return {}
 
+    def get_issue_origin(self):
+        """ Return the origin shared by all issues of this target. """
+        if getattr(self, '_issue_origin', None) is None:
+            origin = {
+                'annotation_length': self.anno_len,
+                'default_priority': self.default_priority,
+                'description_length': self.desc_len,
+                'templates': self.templates,
+                'template_cache': self.template_cache,
+                'target': self.target,
+                'shorten': self.shorten,
+                'inline_links': self.inline_links,
+                'add_tags': self.add_tags,
+            }
+            origin.update(self.get_service_metadata())
+            self._issue_origin = origin
+        return self._issue_origin
+
     def get_issue_for_record(self, record, extra=None):
-        origin = {
-            'annotation_length': self.anno_len,
-            'default_priority': self.default_priority,
-            'description_length': self.desc_len,
-            'templates': self.get_templates(),
-            'target': self.target,
-            'shorten': self.shorten,
-            'inline_links': self.inline_links,
-            'add_tags': self.add_tags,
-        }
-        origin.update(self.get_service_metadata())
-        return self.ISSUE_CLASS(record, origin=origin, extra=extra)
+        return self.ISSUE_CLASS(
+            record, origin=self.get_issue_origin(), extra=extra)
 
     def build_annotations(self, annotations, url):
         final = []
@@ -181,21 +428,17 @@ class IssueService(abc.ABC):
 
     def include(self, issue):
         """ Return true if the issue in question should be included """
-        only_if_assigned = self.config.get('only_if_assigned', None)
-
-        if only_if_assigned:
+        if self.only_if_assigned:
             owner = self.get_owner(issue)
-            include_owners = [only_if_assigned]
+            include_owners = [self.only_if_assigned]
 
-            if self.config.get('also_unassigned', None, asbool):
+            if self.also_unassigned:
                 include_owners.append(None)
 
             return owner in include_owners
 
-        only_if_author = self.config.get('only_if_author', None)
-
-        if only_if_author:
-            return self.get_author(issue) == only_if_author
+        if self.only_if_author:
+            return self.get_author(issue) == self.only_if_author
 
         return True
 
@@ -269,13 +512,28 @@ class Issue(abc.ABC):
     # system and the string values 'H', 'M' or 'L'.
     PRIORITY_MAP = {}
 
+    # Issues are held by the thousand: subclasses should define __slots__
+    # as well (usually empty) so that they don't get a __dict__.
+    __slots__ = (
+        '_foreign_record', '_origin', '_extra',
+        '_taskwarrior_record', '_refined_record', '_template_context',
+    )
+
     def __init__(self, foreign_record, origin=None, extra=None):
         self._foreign_record = foreign_record
+        # The origin is shared by all issues of a target: don't modify it.
         self._origin = origin if origin else {}
         self._extra = extra if extra else {}
+        self._taskwarrior_record = None
+        self._refined_record = None
+        self._template_context = None
 
     def update_extra(self, extra):
         self._extra.update(extra)
+        # Records and template contexts computed so far depend on extra.
+        self._taskwarrior_record = None
+        self._refined_record = None
+        self._template_context = None
 
     @abc.abstractmethod
     def to_taskwarrior(self):
@@ -298,22 +556,49 @@ class Issue(abc.ABC):
     def get_added_tags(self):
         added_tags = []
         for tag in self.origin['add_tags']:
-            tag = Template(tag).render(self.get_template_context())
+            tag = self.render_template(tag, self.get_template_context())
             if tag:
                 added_tags.append(tag)
 
         return added_tags
 
     def get_taskwarrior_record(self, refined=True):
-        if not getattr(self, '_taskwarrior_record', None):
+        return copy.deepcopy(self._get_taskwarrior_record(refined))
+
+    def _get_taskwarrior_record(self, refined=True):
+        """ Return the record, computed only once until `update_extra`.
+
+        Rendering templates is expensive, and the record is read field by
+        field through the mapping interface.  The returned record is shared
+        and must not be modified; `get_taskwarrior_record` returns a copy.
+        """
+        if not self._taskwarrior_record:
             self._taskwarrior_record = self.to_taskwarrior()
-        record = copy.deepcopy(self._taskwarrior_record)
-        if refined:
-            record = self.refine_record(record)
-        if not 'tags' in record:
-            record['tags'] = []
-        if refined:
+            if not 'tags' in self._taskwarrior_record:
+                self._taskwarrior_record['tags'] = []
+        if not refined:
+            return self._taskwarrior_record
+
+        if not self._refined_record:
+            record = self.refine_record(
+                copy.deepcopy(self._taskwarrior_record))
+            if not 'tags' in record:
+                record['tags'] = []
             record['tags'].extend(self.get_added_tags())
+            self._refined_record = record
+        return self._refined_record
+
+    def materialize(self):
+        """ Compute the taskwarrior record and release the foreign record.
+
+        The foreign record is the whole document the service returned, of
+        which only a few fields end up in the taskwarrior record.  Once an
+        issue is materialized, `record` is None and `update_extra` must not
+        be called anymore.  The returned record must not be modified.
+        """
+        record = self._get_taskwarrior_record()
+        self._foreign_record = None
+        self._template_context = None
         return record
 
     def get_priority(self):
@@ -346,14 +631,15 @@ class Issue(abc.ABC):
 
         """
         if date:
-            date = parse_date(date)
-            if not date.tzinfo:
-                if timezone == LOCAL_TIMEZONE:
-                    tzinfo = tzlocal()
-                else:
-                    tzinfo = pytz.timezone(timezone)
-                date = date.replace(tzinfo=tzinfo)
-            return date
+            parsed = None
+            if isinstance(date, six.string_types):
+                parsed = parse_iso_date(date)
+            if parsed is None:
+                from dateutil.parser import parse as parse_date
+                parsed = parse_date(date)
+            if not parsed.tzinfo:
+                parsed = parsed.replace(tzinfo=get_tzinfo(timezone))
+            return parsed
         return None
 
     def build_default_description(
@@ -380,32 +666,44 @@ class Issue(abc.ABC):
         )
 
     def _get_unique_identifier(self):
-        record = self.get_taskwarrior_record()
+        record = self._get_taskwarrior_record()
         return dict([
             (key, record[key],) for key in self.UNIQUE_KEY
         ])
 
     def get_template_context(self):
-        context = (
-            self.get_taskwarrior_record(refined=False).copy()
-        )
-        context.update(self.extra)
-        context.update({
-            'description': self.get_default_description(),
-        })
-        return context
+        if not self._template_context:
+            context = self._get_taskwarrior_record(refined=False).copy()
+            context.update(self.extra)
+            context.update({
+                'description': self.get_default_description(),
+            })
+            self._template_context = context
+        return self._template_context
+
+    def get_template(self, source):
+        """ Return `source` compiled, through the cache of the target. """
+        cache = self.origin.get('template_cache')
+        if cache is None:
+            cache = get_template_cache(self.origin.get('target'))
+        return cache.get(source)
+
+    def render_template(self, source, *args, **kwargs):
+        return self.get_template(source).render(*args, **kwargs)
 
     def refine_record(self, record):
+        from taskw.task import Task
         for field in six.iterkeys(Task.FIELDS):
             if field in self.origin['templates']:
-                template = Template(self.origin['templates'][field])
-                record[field] = template.render(self.get_template_context())
+                record[field] = self.render_template(
+                    self.origin['templates'][field],
+                    self.get_template_context())
             elif hasattr(self, 'get_default_%s' % field):
                 record[field] = getattr(self, 'get_default_%s' % field)()
         return record
 
     def __iter__(self):
-        record = self.get_taskwarrior_record()
+        record = self._get_taskwarrior_record()
         for key in six.iterkeys(record):
             yield key
 
@@ -416,11 +714,11 @@ class Issue(abc.ABC):
         return self.__iter__()
 
     def items(self):
-        record = self.get_taskwarrior_record()
+        record = self._get_taskwarrior_record()
         return list(six.iteritems(record))
 
     def iteritems(self):
-        record = self.get_taskwarrior_record()
+        record = self._get_taskwarrior_record()
         for item in six.iteritems(record):
             yield item
 
@@ -436,7 +734,7 @@ class Issue(abc.ABC):
             return default
 
     def __getitem__(self, attribute):
-        record = self.get_taskwarrior_record()
+        record = self._get_taskwarrior_record()
         return record[attribute]
 
     def __setitem__(self, attribute, value):
@@ -464,7 +762,7 @@ class Issue(abc.ABC):
     def __str__(self):
         return '%s: %s' % (
             self.origin['target'],
-            self.get_taskwarrior_record()['description']
+            self._get_taskwarrior_record()['description']
         )
 
     def __repr__(self):
@@ -473,6 +771,14 @@ class Issue(abc.ABC):
 
 class ServiceClient:
     """ Abstract class responsible for making requests to service API's. """
+    @staticmethod
+    def get_session():
+        """ Return a session sharing its connections with all services.
+
+        See :mod:`bugwarrior.sessions`.
+        """
+        return sessions.get_session()
+
     @staticmethod
     def json_response(response):
         # If we didn't get good results, just bail.
@@ -489,6 +795,16 @@ class ServiceClient:
             return response.json
 
 
+def dump_records(records):
+    """ Pickle a chunk of taskwarrior records to send them to the parent.
+
+    The queue would pickle them with its default protocol; protocol 5 (or
+    whatever is highest) is more compact, and the queue only has to copy
+    the resulting bytes.
+    """
+    return pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+
+
 def _aggregate_issues(conf, main_section, target, queue, service_name):
     """ This worker function is separated out from the main
     :func:`aggregate_issues` func only so that we can use multiprocessing
@@ -496,13 +812,34 @@ def _aggregate_issues(conf, main_section, target, queue, service_name):
     """
 
     start = time.time()
+    start_hits, start_misses = sessions.get_cache_stats()
+
+    chunk_size = None
+    if conf.has_option(main_section, 'record_chunk_size'):
+        chunk_size = asint(conf.get(main_section, 'record_chunk_size'))
 
     try:
         service = get_service(service_name)(conf, main_section, target)
         issue_count = 0
-        for issue in service.issues():
-            queue.put(issue)
-            issue_count += 1
+        chunk = []
+        try:
+            for issue in service.issues():
+                issue_count += 1
+                if not chunk_size:
+                    queue.put(issue)
+                    continue
+                # Convert issues here, in parallel with other workers, and
+                # only send the resulting records back.
+                if isinstance(issue, Issue):
+                    chunk.append(issue.materialize())
+                else:
+                    chunk.append(dict(issue))
+                if len(chunk) >= chunk_size:
+                    queue.put(dump_records(chunk))
+                    chunk = []
+        finally:
+            if chunk:
+                queue.put(dump_records(chunk))
     except SystemExit as e:
         log.critical(str(e))
         queue.put((SERVICE_FINISHED_ERROR, (target, e)))
@@ -520,18 +857,92 @@ def _aggregate_issues(conf, main_section, target, queue, service_name):
     finally:
         duration = time.time() - start
         log.info("Done with [%s] in %fs" % (target, duration))
+        hits, misses = sessions.get_cache_stats()
+        if hits != start_hits or misses != start_misses:
+            log.info("HTTP cache for [%s]: %i hits, %i misses" % (
+                target, hits - start_hits, misses - start_misses))
+
+
+def prefetch_passwords(conf, targets):
+    """ Resolve the ``@oracle:`` passwords of all `targets` up front.
+
+    Workers would otherwise each ask the keyring or gpg-agent for them at
+    the same time.  Passwords are remembered by the credential broker of
+    `conf`, which the workers inherit.
+
+    Return the targets whose workers may still look passwords up: those
+    leaving a password option unset, which services may then look up in
+    the keyring, and those whose password couldn't be resolved here.  The
+    latter fail in their worker, like any other target.
+    """
+    unresolved = []
+    for target in targets:
+        try:
+            service = get_service(conf.get(target, 'service'))
+            service_config = ServiceConfig(
+                service.CONFIG_PREFIX, conf, target)
+            for key, login_key in six.iteritems(service.PASSWORD_OPTIONS):
+                oracle = service_config.get(key)
+                if not oracle:
+                    if target not in unresolved:
+                        unresolved.append(target)
+                    continue
+                if not oracle.startswith('@oracle:'):
+                    continue
+                login = 'nousername'
+                if login_key:
+                    login = service_config.get(login_key)
+                get_credential_broker(conf).get_password(
+                    service.get_keyring_service(service_config), login,
+                    oracle=oracle, interactive=conf.interactive)
+        except (SystemExit, Exception) as e:
+            log.debug("Unable to prefetch passwords of [%s]: %s" % (
+                target, e))
+            if target not in unresolved:
+                unresolved.append(target)
+    return unresolved
+
+
+def _aggregate_targets(conf, main_section, targets, queue):
+    """ Pull issues from the targets taken from `targets` until it yields
+    None.  Workers run this, so that each of them handles several targets
+    in turn. """
+    for target in iter(targets.get, None):
+        _aggregate_issues(
+            conf, main_section, target, queue, conf.get(target, 'service'))
 
 
 def aggregate_issues(conf, main_section, debug):
-    """ Return all issues from every target. """
+    """ Return a generator of all issues from every target.
+
+    Workers are started right away rather than once the generator is
+    consumed, so that worker processes are forked before the caller starts
+    any thread of its own (a forked child only gets the thread which forked
+    it, and would deadlock on any lock another thread held).
+    """
     log.info("Starting to aggregate remote issues.")
 
     # Create and call service objects for every target in the config
     targets = aslist(conf.get(main_section, 'targets'))
 
-    queue = multiprocessing.Queue()
+    max_workers = None
+    if conf.has_option(main_section, 'max_workers'):
+        max_workers = asint(conf.get(main_section, 'max_workers'))
+    if not max_workers:
+        max_workers = len(targets)
 
-    log.info("Spawning %i workers." % len(targets))
+    worker_backend = 'process'
+    if conf.has_option(main_section, 'worker_backend'):
+        worker_backend = conf.get(main_section, 'worker_backend')
+
+    if worker_backend == 'thread' and not debug:
+        queue = six.moves.queue.Queue()
+        waiting = six.moves.queue.Queue()
+        worker_class = threading.Thread
+    else:
+        queue = multiprocessing.Queue()
+        waiting = multiprocessing.Queue()
+        worker_class = multiprocessing.Process
 
     if debug:
         for target in targets:
@@ -543,28 +954,44 @@ def aggregate_issues(conf, main_section, debug):
                 conf.get(target, 'service')
             )
     else:
-        for target in targets:
-            proc = multiprocessing.Process(
-                target=_aggregate_issues,
-                args=(conf, main_section, target, queue, conf.get(target, 'service'))
+        stagger = bool(prefetch_passwords(conf, targets))
+        # Targets are handed to workers as earlier ones finish, so that no
+        # more than max_workers of them run at once.
+        workers = min(max_workers, len(targets))
+        for target in targets + [None] * workers:
+            waiting.put(target)
+        log.info("Spawning %i workers." % workers)
+        for i in range(workers):
+            if stagger and i:
+                # Sleep for 1 second here to try and avoid a race condition
+                # where all N workers start up and ask the gpg-agent process
+                # for the passwords which weren't prefetched at the same
+                # time.  This causes gpg-agent to fumble and tell some of
+                # our workers some incomplete things.
+                time.sleep(1)
+            worker = worker_class(
+                target=_aggregate_targets,
+                args=(conf, main_section, waiting, queue),
             )
-            proc.start()
+            worker.start()
+
+    return _collect_issues(queue, len(targets))
 
-            # Sleep for 1 second here to try and avoid a race condition where
-            # all N workers start up and ask the gpg-agent process for
-            # information at the same time.  This causes gpg-agent to fumble
-            # and tell some of our workers some incomplete things.
-            time.sleep(1)
 
-    currently_running = len(targets)
+def _collect_issues(queue, currently_running):
+    """ Yield the issues workers put in `queue` until all targets are done.
+    """
     while currently_running > 0:
         issue = queue.get(True)
+        if isinstance(issue, bytes):
+            for record in pickle.loads(issue):
+                yield record
+            continue
         if isinstance(issue, tuple):
             completion_type, args = issue
             if completion_type == SERVICE_FINISHED_ERROR:
                 target, e = args
                 log.exception(f"Aborted {target} due to critical error.")
-                currently_running -= 1
                 yield ('SERVICE FAILED', target)
             currently_running -= 1
             continue
@@ -23,6 +23,7 @@ class ActiveCollabClient(object):
 
 
 class ActiveCollabIssue(Issue):
+    __slots__ = ()
     BODY = 'acbody'
     NAME = 'acname'
     PERMALINK = 'acpermalink'
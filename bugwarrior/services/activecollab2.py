@@ -2,7 +2,6 @@ import itertools
 import time
 
 import six
-import requests
 
 from bugwarrior.services import IssueService, Issue, ServiceClient
 from bugwarrior.config import die
@@ -18,6 +17,7 @@ class ActiveCollab2Client(ServiceClient):
         self.user_id = user_id
         self.projects = projects
         self.target = target
+        self.session = self.get_session()
 
     def get_task_dict(self, project, key, task):
         assigned_task = {
@@ -74,10 +74,11 @@ class ActiveCollab2Client(ServiceClient):
             'path_info': uri,
             'format': 'json'}
 
-        return self.json_response(requests.get(url, params=params))
+        return self.json_response(self.session.get(url, params=params))
 
 
 class ActiveCollab2Issue(Issue):
+    __slots__ = ()
     BODY = 'ac2body'
     NAME = 'ac2name'
     PERMALINK = 'ac2permalink'
@@ -2,7 +2,6 @@ from bugwarrior.config import die
 from bugwarrior.services import IssueService, Issue, ServiceClient
 from urllib.parse import quote
 import base64
-import requests
 import re
 
 
@@ -31,7 +30,7 @@ class AzureDevopsClient(ServiceClient):
         self.project = quote(project)
         self.host = host
         self.base_url = f"https://{host}/{org}/{project}/_apis/wit"
-        self.session = requests.Session()
+        self.session = self.get_session()
         self.session.headers = {
             "authorization": f"Basic {self.token}",
             "accept": "application/json",
@@ -66,6 +65,7 @@ class AzureDevopsClient(ServiceClient):
             return None
 
 class AzureDevopsIssue(Issue):
+    __slots__ = ()
     TITLE = "adotitle"
     DESCRIPTION = "adodescription"
     ID = "adoid"
@@ -199,8 +199,7 @@ class AzureDevopsService(IssueService):
         return self.build_annotations(annotations, issue_obj.get_processed_url(url))
 
     def issues(self):
-        issue_ids = self.get_query()
-        for issue_id in issue_ids:
+        def get_issue_obj(issue_id):
             issue = self.client.get_work_item(issue_id)
             parent_title = self.client.get_parent_name(issue)
             issue["ParentTitle"] = parent_title
@@ -211,6 +210,10 @@ class AzureDevopsService(IssueService):
                 "namespace": f"{self.org}\\{self.project}",
             }
             issue_obj.update_extra(extra)
+            return issue_obj
+
+        issue_ids = self.get_query()
+        for issue_obj in self.map_concurrently(get_issue_obj, issue_ids):
             yield issue_obj
 
     @classmethod
@@ -1,8 +1,6 @@
 from __future__ import unicode_literals
 from builtins import filter
 
-import requests
-
 from bugwarrior.services import IssueService, Issue, ServiceClient
 from bugwarrior.config import asbool, aslist, die
 
@@ -10,6 +8,7 @@ import logging
 log = logging.getLogger(__name__)
 
 class BitbucketIssue(Issue):
+    __slots__ = ()
     TITLE = 'bitbuckettitle'
     URL = 'bitbucketurl'
     FOREIGN_ID = 'bitbucketid'
@@ -61,6 +60,7 @@ class BitbucketIssue(Issue):
 class BitbucketService(IssueService, ServiceClient):
     ISSUE_CLASS = BitbucketIssue
     CONFIG_PREFIX = 'bitbucket'
+    PASSWORD_OPTIONS = {'password': 'login'}
 
     BASE_API2 = 'https://api.bitbucket.org/2.0'
     BASE_URL = 'https://bitbucket.org/'
@@ -68,6 +68,8 @@ class BitbucketService(IssueService, ServiceClient):
     def __init__(self, *args, **kw):
         super(BitbucketService, self).__init__(*args, **kw)
 
+        self.session = self.get_session()
+
         key = self.config.get('key')
         secret = self.config.get('secret')
         auth = {'oauth': (key, secret)}
@@ -81,13 +83,13 @@ class BitbucketService(IssueService, ServiceClient):
 
         if key and secret:
             if refresh_token:
-                response = requests.post(
+                response = self.session.post(
                     self.BASE_URL + 'site/oauth2/access_token',
                     data={'grant_type': 'refresh_token',
                           'refresh_token': refresh_token},
                     auth=auth['oauth']).json()
             else:
-                response = requests.post(
+                response = self.session.post(
                     self.BASE_URL + 'site/oauth2/access_token',
                     data={'grant_type': 'password',
                           'username': login,
@@ -140,7 +142,8 @@ class BitbucketService(IssueService, ServiceClient):
 
     def get_data(self, url):
         """ Perform a request to the fully qualified url and return json. """
-        return self.json_response(requests.get(url, **self.requests_kwargs))
+        return self.json_response(
+            self.session.get(url, **self.requests_kwargs))
 
     def get_collection(self, url):
         """ Pages through an object collection from the bitbucket API.
@@ -207,7 +210,8 @@ class BitbucketService(IssueService, ServiceClient):
         issues = list(filter(self.include, issues))
         log.debug(" Pruned down to %i", len(issues))
 
-        for tag, issue in issues:
+        def get_issue_obj(tag_issue):
+            tag, issue = tag_issue
             issue_obj = self.get_issue_for_record(issue)
             tagParts = tag.split('/')
             projectName = tagParts[1]
@@ -220,6 +224,9 @@ class BitbucketService(IssueService, ServiceClient):
                 'annotations': self.get_annotations(tag, issue, issue_obj, url)
             }
             issue_obj.update_extra(extras)
+            return issue_obj
+
+        for issue_obj in self.map_concurrently(get_issue_obj, issues):
             yield issue_obj
 
         if not self.filter_merge_requests:
@@ -233,7 +240,8 @@ class BitbucketService(IssueService, ServiceClient):
             pull_requests = list(filter(self.include, pull_requests))
             log.debug(" Pruned down to %i", len(pull_requests))
 
-            for tag, issue in pull_requests:
+            def get_pull_request_obj(tag_issue):
+                tag, issue = tag_issue
                 issue_obj = self.get_issue_for_record(issue)
                 tagParts = tag.split('/')
                 projectName = tagParts[1]
@@ -249,4 +257,8 @@ class BitbucketService(IssueService, ServiceClient):
                         tag, issue, issue_obj, url)
                 }
                 issue_obj.update_extra(extras)
+                return issue_obj
+
+            for issue_obj in self.map_concurrently(
+                    get_pull_request_obj, pull_requests):
                 yield issue_obj
@@ -1,6 +1,5 @@
 from builtins import str
 import debianbts
-import requests
 
 from bugwarrior.config import die, asbool
 from bugwarrior.services import Issue, IssueService, ServiceClient
@@ -12,6 +11,7 @@ UDD_BUGS_SEARCH = "https://udd.debian.org/bugs/"
 
 
 class BTSIssue(Issue):
+    __slots__ = ()
     SUBJECT = 'btssubject'
     URL = 'btsurl'
     NUMBER = 'btsnumber'
@@ -98,6 +98,7 @@ class BTSService(IssueService, ServiceClient):
 
     def __init__(self, *args, **kw):
         super(BTSService, self).__init__(*args, **kw)
+        self.session = self.get_session()
         self.email = self.config.get('email', default=None)
         self.packages = self.config.get('packages', default=None)
         self.udd = self.config.get(
@@ -151,7 +152,7 @@ class BTSService(IssueService, ServiceClient):
             }
         if self.udd_ignore_sponsor:
             request_params['nosponsor1'] = "on"
-        resp = requests.get(UDD_BUGS_SEARCH, request_params)
+        resp = self.session.get(UDD_BUGS_SEARCH, params=request_params)
         return self.json_response(resp)
 
     def annotations(self, issue, issue_obj):
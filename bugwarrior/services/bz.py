@@ -13,6 +13,7 @@ log = logging.getLogger(__name__)
 
 
 class BugzillaIssue(Issue):
+    __slots__ = ()
     URL = 'bugzillaurl'
     SUMMARY = 'bugzillasummary'
     BUG_ID = 'bugzillabugid'
@@ -113,6 +114,7 @@ _open_statuses = [
 class BugzillaService(IssueService):
     ISSUE_CLASS = BugzillaIssue
     CONFIG_PREFIX = 'bugzilla'
+    PASSWORD_OPTIONS = {'api_key': None, 'password': 'username'}
 
     COLUMN_LIST = [
         'id',
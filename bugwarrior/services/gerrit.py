@@ -10,6 +10,7 @@ from bugwarrior.services import IssueService, Issue, ServiceClient
 
 
 class GerritIssue(Issue):
+    __slots__ = ()
     SUMMARY = 'gerritsummary'
     URL = 'gerriturl'
     FOREIGN_ID = 'gerritid'
@@ -66,6 +67,7 @@ class GerritIssue(Issue):
 class GerritService(IssueService, ServiceClient):
     ISSUE_CLASS = GerritIssue
     CONFIG_PREFIX = 'gerrit'
+    PASSWORD_OPTIONS = {'password': 'username'}
 
     def __init__(self, *args, **kw):
         super(GerritService, self).__init__(*args, **kw)
@@ -73,7 +75,7 @@ class GerritService(IssueService, ServiceClient):
         self.username = self.config.get('username')
         self.password = self.get_password('password', self.username)
         self.ssl_ca_path = self.config.get('ssl_ca_path', None)
-        self.session = requests.session()
+        self.session = self.get_session()
         self.session.headers.update({
             'Accept': 'application/json',
             'Accept-Encoding': 'gzip',
@@ -4,12 +4,11 @@ import six
 import sys
 from urllib.parse import urlparse
 
-import requests
 from six.moves.urllib.parse import quote_plus
-from jinja2 import Template
 
 from bugwarrior.config import asbool, aslist, die
-from bugwarrior.services import IssueService, Issue, ServiceClient
+from bugwarrior.services import (
+    IssueService, Issue, ServiceClient, metadata_cache)
 
 import logging
 log = logging.getLogger(__name__)
@@ -19,7 +18,7 @@ class GithubClient(ServiceClient):
     def __init__(self, host, auth):
         self.host = host
         self.auth = auth
-        self.session = requests.Session()
+        self.session = self.get_session()
         if 'token' in self.auth:
             authorization = 'token ' + self.auth['token']
             self.session.headers['Authorization'] = authorization
@@ -122,6 +121,7 @@ class GithubClient(ServiceClient):
 
 
 class GithubIssue(Issue):
+    __slots__ = ()
     TITLE = 'githubtitle'
     BODY = 'githubbody'
     CREATED_AT = 'githubcreatedon'
@@ -234,7 +234,7 @@ class GithubIssue(Issue):
             return tags
 
         context = self.record.copy()
-        label_template = Template(self.origin['label_template'])
+        label_template = self.get_template(self.origin['label_template'])
 
         for label_dict in self.record.get('labels', []):
             context.update({
@@ -258,6 +258,7 @@ class GithubIssue(Issue):
 class GithubService(IssueService):
     ISSUE_CLASS = GithubIssue
     CONFIG_PREFIX = 'github'
+    PASSWORD_OPTIONS = {'token': 'login', 'password': 'login'}
 
     def __init__(self, *args, **kw):
         super(GithubService, self).__init__(*args, **kw)
@@ -295,6 +296,8 @@ class GithubService(IssueService):
         self.label_template = self.config.get(
             'label_template', default='{{label}}', to_type=six.text_type
         )
+        self.body_length = self.config.get(
+            'body_length', default=sys.maxsize, to_type=int)
         self.project_owner_prefix = self.config.get(
             'project_owner_prefix', default=False, to_type=asbool
         )
@@ -320,6 +323,10 @@ class GithubService(IssueService):
             'label_template': self.label_template,
         }
 
+    @metadata_cache()
+    def get_repos(self):
+        return self.client.get_repos(self.username)
+
     def get_owned_repo_issues(self, tag):
         """ Grab all the issues """
         issues = {}
@@ -386,8 +393,7 @@ class GithubService(IssueService):
 
         if body:
             body = body.replace('\r\n', '\n')
-            max_length = self.config.get('body_length', default=sys.maxsize, to_type=int)
-            body = body[:max_length]
+            body = body[:self.body_length]
 
         return body
 
@@ -444,7 +450,7 @@ class GithubService(IssueService):
             if self.include_repos:
                 repos = self.include_repos
             else:
-                all_repos = self.client.get_repos(self.username)
+                all_repos = self.get_repos()
                 repos = filter(self.filter_repos, all_repos)
                 repos = [repo['name'] for repo in repos]
 
@@ -463,7 +469,8 @@ class GithubService(IssueService):
         issues = list(filter(self.include, issues.values()))
         log.debug(" Pruned down to %i issues.", len(issues))
 
-        for tag, issue in issues:
+        def get_issue_obj(tag_issue):
+            tag, issue = tag_issue
             # Stuff this value into the upstream dict for:
             # https://github.com/ralphbean/bugwarrior/issues/159
             issue['repo'] = tag
@@ -481,6 +488,9 @@ class GithubService(IssueService):
                 'namespace': self.username,
             }
             issue_obj.update_extra(extra)
+            return issue_obj
+
+        for issue_obj in self.map_concurrently(get_issue_obj, issues):
             yield issue_obj
 
     @classmethod
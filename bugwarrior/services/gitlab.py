@@ -13,7 +13,6 @@ import re
 import requests
 import six
 
-from jinja2 import Template
 
 from bugwarrior.config import asbool, aslist, die
 from bugwarrior.services import IssueService, Issue, ServiceClient
@@ -23,6 +22,7 @@ log = logging.getLogger(__name__)
 
 
 class GitlabIssue(Issue):
+    __slots__ = ('title', )
     TITLE = 'gitlabtitle'
     DESCRIPTION = 'gitlabdescription'
     CREATED_AT = 'gitlabcreatedon'
@@ -211,7 +211,7 @@ class GitlabIssue(Issue):
             return tags
 
         context = self.record.copy()
-        label_template = Template(self.origin['label_template'])
+        label_template = self.get_template(self.origin['label_template'])
 
         for label in self.record.get('labels', []):
             context.update({
@@ -235,10 +235,13 @@ class GitlabIssue(Issue):
 class GitlabService(IssueService, ServiceClient):
     ISSUE_CLASS = GitlabIssue
     CONFIG_PREFIX = 'gitlab'
+    PASSWORD_OPTIONS = {'token': 'login'}
 
     def __init__(self, *args, **kw):
         super(GitlabService, self).__init__(*args, **kw)
 
+        self.session = self.get_session()
+
         host = self.config.get(
             'host', default='gitlab.com', to_type=six.text_type)
         self.login = self.config.get('login')
@@ -378,7 +381,8 @@ class GitlabService(IssueService, ServiceClient):
 
         if not self.verify_ssl:
             requests.packages.urllib3.disable_warnings()
-        response = requests.get(url, headers=headers, verify=self.verify_ssl, **kwargs)
+        response = self.session.get(
+            url, headers=headers, verify=self.verify_ssl, **kwargs)
 
         return self.json_response(response)
 
@@ -459,7 +463,8 @@ class GitlabService(IssueService, ServiceClient):
     def _get_issue_objs(self, issues, issue_type, repo_map):
         type_plural = issue_type + 's'
 
-        for rid, issue in issues:
+        def get_issue_obj(rid_issue):
+            rid, issue = rid_issue
             repo = repo_map[rid]
             issue['repo'] = repo['path']
             projectName = repo['path']
@@ -475,6 +480,9 @@ class GitlabService(IssueService, ServiceClient):
                 'annotations': self.annotations(repo, issue_url, type_plural, issue, issue_obj)
             }
             issue_obj.update_extra(extra)
+            return issue_obj
+
+        for issue_obj in self.map_concurrently(get_issue_obj, issues):
             yield issue_obj
 
     def issues(self):
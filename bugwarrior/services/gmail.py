@@ -10,12 +10,13 @@ import googleapiclient.discovery
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 
-from bugwarrior.services import IssueService, Issue
+from bugwarrior.services import IssueService, Issue, metadata_cache
 
 log = logging.getLogger(__name__)
 
 
 class GmailIssue(Issue):
+    __slots__ = ()
     THREAD_ID = 'gmailthreadid'
     SUBJECT = 'gmailsubject'
     URL = 'gmailurl'
@@ -165,6 +166,7 @@ class GmailService(IssueService):
                 log.info('Storing credentials to %r', self.credentials_path)
             return credentials
 
+    @metadata_cache()
     def get_labels(self):
         result = self.gmail_api.users().labels().list(userId=self.login_name).execute()
         return {label['id']: label['name'] for label in result['labels']}
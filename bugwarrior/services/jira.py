@@ -4,13 +4,12 @@ import sys
 
 
 import six
-from jinja2 import Template
 from jira.client import JIRA as BaseJIRA
 from requests.cookies import RequestsCookieJar
 from dateutil.tz.tz import tzutc
 
 from bugwarrior.config import asbool, die
-from bugwarrior.services import IssueService, Issue
+from bugwarrior.services import IssueService, Issue, metadata_cache
 
 import logging
 log = logging.getLogger(__name__)
@@ -60,6 +59,7 @@ def _parse_sprint_string(sprint):
 
 
 class JiraIssue(Issue):
+    __slots__ = ()
     ISSUE_TYPE = 'jiraissuetype'
     SUMMARY = 'jirasummary'
     URL = 'jiraurl'
@@ -175,7 +175,7 @@ class JiraIssue(Issue):
             return tags
 
         context = self.record.copy()
-        label_template = Template(self.origin['label_template'])
+        label_template = self.get_template(self.origin['label_template'])
 
         sprints = self.__get_sprints()
         for sprint in sprints:
@@ -207,7 +207,7 @@ class JiraIssue(Issue):
             return tags
 
         context = self.record.copy()
-        label_template = Template(self.origin['label_template'])
+        label_template = self.get_template(self.origin['label_template'])
 
         for label in self.record.get('fields', {}).get('labels', []):
             context.update({'label': label})
@@ -277,6 +277,7 @@ class JiraIssue(Issue):
 class JiraService(IssueService):
     ISSUE_CLASS = JiraIssue
     CONFIG_PREFIX = 'jira'
+    PASSWORD_OPTIONS = {'password': 'username'}
 
     def __init__(self, *args, **kw):
         _skip_server = kw.pop('_skip_server', False)
@@ -319,9 +320,12 @@ class JiraService(IssueService):
             'label_template', default='{{label}}', to_type=six.text_type
         )
 
+        self.body_length = self.config.get(
+            'body_length', default=sys.maxsize, to_type=int)
+
         self.sprint_field_names = []
         if self.import_sprints_as_tags:
-            field_names = [field for field in self.jira.fields()
+            field_names = [field for field in self.get_fields()
                            if field['name'] == 'Sprint']
             if len(field_names) < 1:
                 log.warn("No sprint custom field found.  Ignoring sprints.")
@@ -330,6 +334,10 @@ class JiraService(IssueService):
                 log.info("Found %i distinct sprint fields." % len(field_names))
                 self.sprint_field_names = [field['id'] for field in field_names]
 
+    @metadata_cache()
+    def get_fields(self):
+        return self.jira.fields()
+
     @staticmethod
     def get_keyring_service(service_config):
         username = service_config.get('username')
@@ -362,8 +370,7 @@ class JiraService(IssueService):
         body = issue.record.get('fields', {}).get('description')
 
         if body:
-            max_length = self.config.get('body_length', default=sys.maxsize, to_type=int)
-            body = body[:max_length]
+            body = body[:self.body_length]
 
         return body
 
@@ -384,7 +391,7 @@ class JiraService(IssueService):
         if self.config.has_option(self.target, 'jira.version'):
             jira_version = self.config.getint(self.target, 'jira.version')
 
-        for case in cases:
+        def get_issue(case):
             issue = self.get_issue_for_record(case.raw)
             extra = {
                 'jira_version': jira_version,
@@ -395,4 +402,7 @@ class JiraService(IssueService):
                     'annotations': self.annotations(case, issue)
                 })
             issue.update_extra(extra)
+            return issue
+
+        for issue in self.map_concurrently(get_issue, cases):
             yield issue
@@ -7,12 +7,13 @@ from dateutil.tz.tz import tzutc
 from kanboard import Client
 
 from bugwarrior.config import die
-from bugwarrior.services import Issue, IssueService
+from bugwarrior.services import Issue, IssueService, metadata_cache
 
 log = logging.getLogger(__name__)
 
 
 class KanboardIssue(Issue):
+    __slots__ = ()
     TASK_ID = "kanboardtaskid"
     TASK_TITLE = "kanboardtasktitle"
     TASK_DESCRIPTION = "kanboardtaskdescription"
@@ -103,6 +104,7 @@ class KanboardIssue(Issue):
 class KanboardService(IssueService):
     ISSUE_CLASS = KanboardIssue
     CONFIG_PREFIX = "kanboard"
+    PASSWORD_OPTIONS = {"password": "username"}
 
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
@@ -121,10 +123,14 @@ class KanboardService(IssueService):
             ((c["name"], c["comment"]) for c in comments), url
         )
 
+    @metadata_cache()
+    def get_projects(self):
+        return self.client.get_my_projects_list()
+
     def issues(self):
         # The API provides only a per-project search. Retrieve the list of
         # projects first and query each project in turn.
-        projects = self.client.get_my_projects_list()
+        projects = self.get_projects()
         tasks = []
         for project_id, project_name in projects.items():
             log.debug(
@@ -137,7 +143,7 @@ class KanboardService(IssueService):
             log.debug("Found %d task(s) in project %r", len(response), project_name)
             tasks.extend(response)
 
-        for task in tasks:
+        def get_issue(task):
             task_id = task["id"]
             extra = {}
 
@@ -152,7 +158,10 @@ class KanboardService(IssueService):
             # Resolve a task's comments.
             extra["annotations"] = self.annotations(task, extra["url"])
 
-            yield self.get_issue_for_record(task, extra)
+            return self.get_issue_for_record(task, extra)
+
+        for issue in self.map_concurrently(get_issue, tasks):
+            yield issue
 
     @classmethod
     def validate_config(cls, service_config, target):
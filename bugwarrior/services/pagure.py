@@ -4,9 +4,7 @@ import six
 import datetime
 import pytz
 
-import requests
 
-from jinja2 import Template
 
 from bugwarrior.config import asbool, aslist, die
 from bugwarrior.services import IssueService, Issue
@@ -16,6 +14,7 @@ log = logging.getLogger(__name__)
 
 
 class PagureIssue(Issue):
+    __slots__ = ()
     TITLE = 'paguretitle'
     DATE_CREATED = 'paguredatecreated'
     URL = 'pagureurl'
@@ -82,7 +81,7 @@ class PagureIssue(Issue):
             return tags
 
         context = self.record.copy()
-        tag_template = Template(self.origin['tag_template'])
+        tag_template = self.get_template(self.origin['tag_template'])
 
         for tagname in self.record.get('tags', []):
             context.update({'label': self._normalize_label_to_tag(tagname) })
@@ -106,7 +105,7 @@ class PagureService(IssueService):
     def __init__(self, *args, **kw):
         super(PagureService, self).__init__(*args, **kw)
 
-        self.session = requests.Session()
+        self.session = self.get_session()
 
         self.tag = self.config.get('tag')
         self.repo = self.config.get('repo')
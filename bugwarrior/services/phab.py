@@ -12,6 +12,7 @@ log = logging.getLogger(__name__)
 
 
 class PhabricatorIssue(Issue):
+    __slots__ = ()
     TITLE = 'phabricatortitle'
     URL = 'phabricatorurl'
     TYPE = 'phabricatortype'
@@ -3,17 +3,17 @@ import six
 import re
 import operator
 
-import requests
-from jinja2 import Template
 
 from bugwarrior.config import asbool, aslist, asint, die
-from bugwarrior.services import IssueService, Issue, ServiceClient
+from bugwarrior.services import (
+    IssueService, Issue, ServiceClient, metadata_cache)
 
 import logging
 log = logging.getLogger(__name__)
 
 
 class PivotalTrackerIssue(Issue):
+    __slots__ = ()
     URL = 'pivotalurl'
     DESCRIPTION = 'pivotaldescription'
     TYPE = 'pivotalstorytype'
@@ -91,7 +91,7 @@ class PivotalTrackerIssue(Issue):
             return tags
 
         context = self.record.copy()
-        label_template = Template(self.origin['label_template'])
+        label_template = self.get_template(self.origin['label_template'])
 
         for label in map(operator.itemgetter('name'), self.record.get('labels', [])):
             context.update({
@@ -124,7 +124,7 @@ class PivotalTrackerService(IssueService, ServiceClient):
         self.token = self.config.get('token')
         self.path = "{0}/{1}".format(self.host, self.version)
 
-        self.session = requests.Session()
+        self.session = self.get_session()
         self.session.headers.update(
             {
                 'X-TrackerToken': self.token,
@@ -198,7 +198,7 @@ class PivotalTrackerService(IssueService, ServiceClient):
     def annotations(self, annotations, story):
         final_annotations = []
         if self.annotation_comments:
-            annotation_template = Template(self.annotation_template)
+            annotation_template = self.template_cache.get(self.annotation_template)
             for annotation in annotations:
                 final_annotations.append(
                     ('task', annotation_template.render(annotation))
@@ -214,7 +214,7 @@ class PivotalTrackerService(IssueService, ServiceClient):
         if not self.import_blockers:
             return blockers
 
-        blocker_template = Template(self.blocker_template)
+        blocker_template = self.template_cache.get(self.blocker_template)
         for blocker in blocker_list:
             blockers.append(
                 blocker_template.render(blocker)
@@ -274,6 +274,7 @@ class PivotalTrackerService(IssueService, ServiceClient):
 
         return json_res
 
+    @metadata_cache()
     def get_projects(self, account_ids):
         params = {
             'account_ids': ','.join(account_ids)
@@ -1,5 +1,4 @@
 import six
-import requests
 import re
 
 from bugwarrior.config import die, asbool
@@ -17,6 +16,7 @@ class RedMineClient(ServiceClient):
         self.auth = auth
         self.issue_limit = issue_limit
         self.verify_ssl = verify_ssl
+        self.session = self.get_session()
 
     def find_issues(self, issue_limit=100, only_if_assigned=False):
         args = {}
@@ -40,10 +40,11 @@ class RedMineClient(ServiceClient):
 
         kwargs['verify'] = self.verify_ssl
 
-        return self.json_response(requests.get(url, **kwargs))
+        return self.json_response(self.session.get(url, **kwargs))
 
 
 class RedMineIssue(Issue):
+    __slots__ = ()
     URL = 'redmineurl'
     SUBJECT = 'redminesubject'
     ID = 'redmineid'
@@ -227,6 +228,7 @@ class RedMineIssue(Issue):
 class RedMineService(IssueService):
     ISSUE_CLASS = RedMineIssue
     CONFIG_PREFIX = 'redmine'
+    PASSWORD_OPTIONS = {'key': None, 'password': 'login'}
 
     def __init__(self, *args, **kw):
         super(RedMineService, self).__init__(*args, **kw)
@@ -1,16 +1,16 @@
 from __future__ import absolute_import
 
-import requests
 import six
-from bugwarrior.db import CACHE_REGION as cache
 from bugwarrior.config import die
-from bugwarrior.services import IssueService, Issue, ServiceClient
+from bugwarrior.services import (
+    IssueService, Issue, ServiceClient, metadata_cache)
 
 import logging
 log = logging.getLogger(__name__)
 
 
 class TaigaIssue(Issue):
+    __slots__ = ()
     SUMMARY = 'taigasummary'
     URL = 'taigaurl'
     FOREIGN_ID = 'taigaid'
@@ -58,6 +58,7 @@ class TaigaIssue(Issue):
 class TaigaService(IssueService, ServiceClient):
     ISSUE_CLASS = TaigaIssue
     CONFIG_PREFIX = 'taiga'
+    PASSWORD_OPTIONS = {'auth_token': None}
 
     def __init__(self, *args, **kw):
         super(TaigaService, self).__init__(*args, **kw)
@@ -67,7 +68,7 @@ class TaigaService(IssueService, ServiceClient):
         self.label_template = self.config.get(
             'label_template', default='{{label}}', to_type=six.text_type
         )
-        self.session = requests.session()
+        self.session = self.get_session()
         self.session.headers.update({
             'Accept': 'application/json',
             'Authorization': 'Bearer %s' % self.auth_token,
@@ -105,14 +106,17 @@ class TaigaService(IssueService, ServiceClient):
             params={'assigned_to': userid, 'status__is_closed': "false"})
         tasks = response.json()
 
-        for task in tasks:
+        def get_issue(task):
             project = self.get_project(task['project'])
             extra = {
                 'project': project['slug'],
                 'annotations': self.annotations(task, project, task_type, task_type_short),
                 'url': self.build_url(task, project, task_type_short),
             }
-            yield self.get_issue_for_record(task, extra)
+            return self.get_issue_for_record(task, extra)
+
+        for issue in self.map_concurrently(get_issue, tasks):
+            yield issue
 
     def issues(self):
         url = self.url + '/api/v1/users/me'
@@ -133,7 +137,8 @@ class TaigaService(IssueService, ServiceClient):
             for issue in self._issues(userid, 'task', 'tasks', 'task'):
                 yield issue
 
-    @cache.cache_on_arguments()
+    # Projects are only looked up by id, so new ones are never missed.
+    @metadata_cache(ttl=24 * 60 * 60)
     def get_project(self, project_id):
         url = '%s/api/v1/projects/%i' % (self.url, project_id)
         return self.json_response(self.session.get(url))
@@ -1,5 +1,4 @@
 import six
-import requests
 
 from bugwarrior.config import die
 from bugwarrior.services import Issue, IssueService, ServiceClient
@@ -13,6 +12,7 @@ class TeamLabClient(ServiceClient):
         self.hostname = hostname
         self.verbose = verbose
         self.token = None
+        self.session = self.get_session()
 
     def authenticate(self, login, password):
         resp = self.call_api("/api/1.0/authentication.json", post={
@@ -33,13 +33,14 @@ class TeamLabClient(ServiceClient):
         if self.token:
             kwargs['headers'] = {'Authorization': self.token}
 
-        response = (requests.post(uri, data=post, **kwargs) if post
-                    else requests.get(uri, **kwargs))
+        response = (self.session.post(uri, data=post, **kwargs) if post
+                    else self.session.get(uri, **kwargs))
 
         return self.json_response(response)
 
 
 class TeamLabIssue(Issue):
+    __slots__ = ()
     URL = 'teamlaburl'
     FOREIGN_ID = 'teamlabid'
     TITLE = 'teamlabtitle'
@@ -103,6 +104,7 @@ class TeamLabIssue(Issue):
 class TeamLabService(IssueService):
     ISSUE_CLASS = TeamLabIssue
     CONFIG_PREFIX = 'teamlab'
+    PASSWORD_OPTIONS = {'password': 'login'}
 
     def __init__(self, *args, **kw):
         super(TeamLabService, self).__init__(*args, **kw)
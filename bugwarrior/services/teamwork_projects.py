@@ -3,7 +3,6 @@ import re
 import six
 from urllib.parse import urlparse
 
-import requests
 from six.moves.urllib.parse import quote_plus
 from jinja2 import Template
 
@@ -18,16 +17,18 @@ class TeamworkClient(ServiceClient):
     def __init__(self, host, token):
         self.host = host
         self.token = token
+        self.session = self.get_session()
 
     def authenticate(self):
-        response = requests.get(self.host + "/authenticate.json", auth=(self.token, ""))
+        response = self.session.get(self.host + "/authenticate.json", auth=(self.token, ""))
         return self.json_response(response)
 
     def call_api(self, method, endpoint, data=None):
-        response = requests.get(self.host + endpoint, auth=(self.token, ""), params=data)
+        response = self.session.get(self.host + endpoint, auth=(self.token, ""), params=data)
         return self.json_response(response)
 
 class TeamworkIssue(Issue):
+    __slots__ = ('user_id', 'name', )
     URL = 'teamwork_url'
     TITLE = 'teamwork_title'
     DESCRIPTION_LONG = 'teamwork_description_long'
@@ -6,17 +6,17 @@ from builtins import range
 import offtrac
 import csv
 import io as StringIO
-import requests
 import urllib.request, urllib.parse, urllib.error
 
 from bugwarrior.config import die, asbool
-from bugwarrior.services import Issue, IssueService
+from bugwarrior.services import Issue, IssueService, ServiceClient
 
 import logging
 log = logging.getLogger(__name__)
 
 
 class TracIssue(Issue):
+    __slots__ = ()
     SUMMARY = 'tracsummary'
     URL = 'tracurl'
     NUMBER = 'tracnumber'
@@ -86,6 +86,7 @@ class TracIssue(Issue):
 class TracService(IssueService):
     ISSUE_CLASS = TracIssue
     CONFIG_PREFIX = 'trac'
+    PASSWORD_OPTIONS = {'password': 'username'}
 
     def __init__(self, *args, **kw):
         super(TracService, self).__init__(*args, **kw)
@@ -148,7 +149,7 @@ class TracService(IssueService):
                 issues[i][1]['url'] = "%s/ticket/%i" % (base_url, tickets[i][0])
                 issues[i][1]['number'] = tickets[i][0]
         else:
-            resp = requests.get(
+            resp = ServiceClient.get_session().get(
                 self.uri + 'query',
                 params={
                     'status': '!closed',
@@ -10,16 +10,16 @@ from future import standard_library
 standard_library.install_aliases()
 from six.moves.configparser import NoOptionError
 
-from jinja2 import Template
-import requests
 
-from bugwarrior.services import IssueService, Issue, ServiceClient
+from bugwarrior.services import (
+    IssueService, Issue, ServiceClient, metadata_cache)
 from bugwarrior.config import die, asbool, aslist
 
 DEFAULT_LABEL_TEMPLATE = "{{label|replace(' ', '_')}}"
 
 
 class TrelloIssue(Issue):
+    __slots__ = ()
     NAME = 'trellocard'
     CARDID = 'trellocardid'
     SHORTCARDID = 'trellocardidshort'
@@ -54,7 +54,7 @@ class TrelloIssue(Issue):
         )
 
     def get_tags(self, twdict):
-        tmpl = Template(
+        tmpl = self.get_template(
             self.origin.get('label_template', DEFAULT_LABEL_TEMPLATE))
         return [tmpl.render(twdict, label=label['name'])
                 for label in self.record['labels']]
@@ -84,6 +84,12 @@ class TrelloService(IssueService, ServiceClient):
     ISSUE_CLASS = TrelloIssue
     # What prefix should we use for this service's configuration values
     CONFIG_PREFIX = 'trello'
+    PASSWORD_OPTIONS = {'token': None}
+
+    def __init__(self, *args, **kw):
+        super(TrelloService, self).__init__(*args, **kw)
+        self.token = self.get_password('token')
+        self.session = self.get_session()
 
     @classmethod
     def validate_config(cls, service_config, target):
@@ -119,13 +125,22 @@ class TrelloService(IssueService, ServiceClient):
         """
         Returns a list of dicts representing issues from a remote service.
         """
-        for board in self.get_boards():
-            for lst in self.get_lists(board['id']):
-                listextra = dict(boardname=board['name'], listname=lst['name'])
-                for card in self.get_cards(lst['id']):
-                    issue = self.get_issue_for_record(card, extra=listextra)
-                    issue.update_extra({"annotations": self.annotations(card)})
-                    yield issue
+        def get_cards():
+            for board in self.get_boards():
+                for lst in self.get_lists(board['id']):
+                    listextra = dict(
+                        boardname=board['name'], listname=lst['name'])
+                    for card in self.get_cards(lst['id']):
+                        yield card, listextra
+
+        def get_issue(card_listextra):
+            card, listextra = card_listextra
+            issue = self.get_issue_for_record(card, extra=listextra)
+            issue.update_extra({"annotations": self.annotations(card)})
+            return issue
+
+        for issue in self.map_concurrently(get_issue, get_cards()):
+            yield issue
 
     def annotations(self, card_json):
         """ A wrapper around get_comments that build the taskwarrior
@@ -137,6 +152,7 @@ class TrelloService(IssueService, ServiceClient):
         return annotations
 
 
+    @metadata_cache()
     def get_boards(self):
         """
         Get the list of boards to pull cards from.  If the user gave a value to
@@ -144,15 +160,15 @@ class TrelloService(IssueService, ServiceClient):
         user's boards.
         """
         if 'include_boards' in self.config:
-            for boardid in self.config.get('include_boards', to_type=aslist):
-                # Get the board name
-                yield self.api_request(
+            # Get the board names
+            return [
+                self.api_request(
                     "/1/boards/{id}".format(id=boardid), fields='name')
-        else:
-            boards = self.api_request("/1/members/me/boards", fields='name')
-            for board in boards:
-                yield board
+                for boardid in self.config.get('include_boards', to_type=aslist)
+            ]
+        return self.api_request("/1/members/me/boards", fields='name')
 
+    @metadata_cache()
     def get_lists(self, board):
         """
         Returns a list of the filtered lists for the given board
@@ -209,6 +225,6 @@ class TrelloService(IssueService, ServiceClient):
         key and token from the configuration
         """
         params['key'] = self.config.get('api_key'),
-        params['token'] = self.get_password('token', self.config),
+        params['token'] = self.token,
         url = "https://api.trello.com" + url
-        return self.json_response(requests.get(url, params=params))
+        return self.json_response(self.session.get(url, params=params))
@@ -7,6 +7,7 @@ from bugwarrior.config import die
 
 
 class VersionOneIssue(Issue):
+    __slots__ = ()
     TASK_NAME = 'versiononetaskname'
     TASK_DESCRIPTION = 'versiononetaskdescrption'
     TASK_ESTIMATE = 'versiononetaskestimate'
@@ -151,6 +152,7 @@ class VersionOneIssue(Issue):
 class VersionOneService(IssueService):
     ISSUE_CLASS = VersionOneIssue
     CONFIG_PREFIX = 'versionone'
+    PASSWORD_OPTIONS = {'password': 'username'}
 
     TASK_COLLECT_DATA = (
         'Name',
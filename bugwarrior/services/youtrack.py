@@ -3,7 +3,6 @@ import re
 import six
 
 import requests
-from jinja2 import Template
 
 from bugwarrior.config import asbool, die
 from bugwarrior.services import IssueService, Issue, ServiceClient
@@ -14,6 +13,7 @@ log = logging.getLogger(__name__)
 
 
 class YoutrackIssue(Issue):
+    __slots__ = ()
     ISSUE = 'youtrackissue'
     SUMMARY = 'youtracksummary'
     URL = 'youtrackurl'
@@ -99,7 +99,7 @@ class YoutrackIssue(Issue):
             return tags
 
         context = self.record.copy()
-        tag_template = Template(self.origin['tag_template'])
+        tag_template = self.get_template(self.origin['tag_template'])
 
         for tag_dict in self.record.get('tag', []):
             context.update({
@@ -115,6 +115,7 @@ class YoutrackIssue(Issue):
 class YoutrackService(IssueService, ServiceClient):
     ISSUE_CLASS = YoutrackIssue
     CONFIG_PREFIX = 'youtrack'
+    PASSWORD_OPTIONS = {'password': 'login'}
 
     def __init__(self, *args, **kw):
         super(YoutrackService, self).__init__(*args, **kw)
@@ -132,7 +133,7 @@ class YoutrackService(IssueService, ServiceClient):
             self.base_url += '/youtrack'
         self.rest_url = self.base_url + '/rest'
 
-        self.session = requests.Session()
+        self.session = self.get_session()
         self.session.headers['Accept'] = 'application/json'
         self.verify_ssl = self.config.get('verify_ssl', default=True, to_type=asbool)
         if not self.verify_ssl:
@@ -0,0 +1,124 @@
+""" HTTP sessions shared by the services.
+
+Opening a connection, and negotiating TLS over it, often takes longer than
+the request itself.  Services get their sessions from :func:`get_session`:
+their connections are pooled per host and kept alive for the whole run,
+whichever service or target opened them, and requests failing because a
+server is overloaded or restarting are retried with backoff.  They keep
+within the rate limits servers announce, see :mod:`bugwarrior.ratelimit`.
+Like any ``requests`` session, they ask for gzip-compressed responses.
+
+With the ``http_cache`` option, their GET requests are also made conditional
+on the responses of earlier runs, see :mod:`bugwarrior.httpcache`.
+"""
+import logging
+import os
+import threading
+
+from bugwarrior.config import asbool, asint
+
+log = logging.getLogger(__name__)
+
+# Options of the main section, mapped to their defaults.
+DEFAULT_OPTIONS = {
+    'http_pool_size': 10,
+    'http_retries': 3,
+    'http_backoff_factor': 0.5,
+    'http_cache': False,
+    'http_rate_limit_wait': 900,
+}
+
+# Responses meaning that the request may succeed if tried again.
+RETRY_STATUSES = (502, 503, 504)
+
+_options = dict(DEFAULT_OPTIONS)
+_adapter = None
+_lock = threading.Lock()
+
+
+def configure(conf, main_section):
+    """ Read the options of the sessions from `main_section` of `conf`. """
+    global _adapter
+    options = dict(DEFAULT_OPTIONS)
+    for option, default in DEFAULT_OPTIONS.items():
+        if not conf.has_option(main_section, option):
+            continue
+        value = conf.get(main_section, option)
+        if option == 'http_backoff_factor':
+            value = float(value) if value else default
+        elif option == 'http_cache':
+            value = asbool(value)
+        else:
+            value = asint(value)
+            if value is None:
+                value = default
+        options[option] = value
+
+    if options['http_cache']:
+        from bugwarrior.db import get_data_location
+        from bugwarrior.httpcache import CACHE_FILE
+        options['http_cache'] = os.path.join(
+            get_data_location(conf, main_section), CACHE_FILE)
+
+    with _lock:
+        if options != _options:
+            _options.update(options)
+            _adapter = None
+
+
+def get_adapter():
+    """ Return the transport adapter shared by all sessions.
+
+    It keeps a pool of up to ``http_pool_size`` connections per host, and
+    the responses cached in the ``http_cache`` file if any.
+    """
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            from urllib3.util.retry import Retry
+            retries = Retry(
+                total=_options['http_retries'],
+                backoff_factor=_options['http_backoff_factor'],
+                status_forcelist=RETRY_STATUSES,
+                # Hand the last response to the service, which reports it.
+                raise_on_status=False,
+                # Rate limit errors are left to the RateLimitingAdapter,
+                # which caps how long they are waited for.
+                respect_retry_after_header=False,
+            )
+            kwargs = dict(
+                pool_maxsize=_options['http_pool_size'],
+                max_retries=retries,
+                max_rate_limit_wait=_options['http_rate_limit_wait'],
+            )
+            if _options['http_cache']:
+                from bugwarrior.httpcache import CachingAdapter, ResponseCache
+                _adapter = CachingAdapter(
+                    ResponseCache(_options['http_cache']), **kwargs)
+            else:
+                from bugwarrior.ratelimit import RateLimitingAdapter
+                _adapter = RateLimitingAdapter(**kwargs)
+        return _adapter
+
+
+def get_cache_stats():
+    """ Return how many requests were answered from the cache so far, and
+    how many weren't. """
+    cache = getattr(_adapter, 'cache', None)
+    if cache is None:
+        return 0, 0
+    return cache.hits, cache.misses
+
+
+def get_session():
+    """ Return a new session using the shared connection pools.
+
+    Sessions aren't shared themselves, as services keep their credentials
+    in them.
+    """
+    import requests
+    session = requests.Session()
+    adapter = get_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
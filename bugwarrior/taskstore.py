@@ -0,0 +1,216 @@
+""" Read-only access to the files Taskwarrior keeps its tasks in.
+
+Forking ``task export`` makes taskwarrior load, parse and render every task
+it knows about, all of which bugwarrior then parses once more.  To match
+issues with tasks, bugwarrior only needs a handful of attributes per task,
+so the functions here read them straight from the data location instead.
+Tasks are still written through ``task`` so that hooks keep running.
+"""
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+
+from six.moves.urllib.parse import quote
+
+log = logging.getLogger(__name__)
+
+DATA_FILES = ('pending.data', 'completed.data')
+
+# The replica Taskwarrior 3 keeps its tasks in.
+TASKCHAMPION_DB = 'taskchampion.sqlite3'
+
+# TaskChampion has no 'waiting' status: waiting tasks are pending.
+TASKCHAMPION_STATUSES = ('pending', 'completed')
+
+# Attributes needed to match issues with tasks, whichever services are used.
+BASE_FIELDS = ('uuid', 'status', 'description')
+
+DECODE_REPLACEMENTS = (
+    ('&open;', '['),
+    ('&close;', ']'),
+    ('&dquot;', '"'),
+)
+
+
+def get_field_pattern(fields):
+    """ Compile a pattern matching the attributes `fields` of a task line.
+
+    Taskwarrior 2.x stores one task per line, as in::
+
+        [description:"Some \\"issue\\"" status:"pending" uuid:"..."]
+
+    Quotes within values are always escaped, so an attribute name followed
+    by ``:"`` and preceded by ``[`` or a space can't be part of a value and
+    the other attributes of the line can be skipped without decoding them.
+    """
+    names = b'|'.join(
+        re.escape(field.encode('utf-8')) for field in sorted(fields))
+    return re.compile(br'[\[ ](' + names + br'):"((?:[^"\\]|\\.)*)"')
+
+
+def decode_value(value):
+    """ Decode a value as encoded in a Taskwarrior 2.x data file. """
+    value = value.decode('utf-8')
+    if '\\' in value:
+        try:
+            value = json.loads('"%s"' % value, strict=False)
+        except ValueError:
+            log.debug("Failed to unescape %r", value)
+    if '&' in value:
+        for encoded, decoded in DECODE_REPLACEMENTS:
+            value = value.replace(encoded, decoded)
+    return value
+
+
+def parse_task_line(line, pattern, numeric=()):
+    """ Return the attributes matched by `pattern` in the data file `line`.
+
+    :params:
+    * `line`: One line of a Taskwarrior 2.x data file, as bytes.
+    * `pattern`: A pattern as returned by :func:`get_field_pattern`.
+    * `numeric`: Names of numeric attributes, which are returned as floats
+      just as ``task export`` returns numbers.
+
+    """
+    record = {}
+    for match in pattern.finditer(line):
+        name = match.group(1).decode('utf-8')
+        value = decode_value(match.group(2))
+        if name in numeric:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        record[name] = value
+    return record
+
+
+def iter_lines(path, use_mmap=False):
+    """ Yield the lines of the file at `path`, optionally through mmap. """
+    with open(path, 'rb') as handle:
+        if use_mmap and os.fstat(handle.fileno()).st_size:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for line in iter(mapped.readline, b''):
+                    yield line
+            finally:
+                mapped.close()
+        else:
+            for line in handle:
+                yield line
+
+
+def read_tasks(data_path, fields, numeric=(), use_mmap=False):
+    """ Yield the tasks stored in the data location `data_path`.
+
+    Only the attributes listed in `fields` (in addition to
+    :data:`BASE_FIELDS`) are decoded, which keeps the tasks small: they are
+    meant for matching, not for being written back.
+
+    :params:
+    * `data_path`: The taskwarrior data location.
+    * `fields`: Names of the attributes to read.
+    * `numeric`: Names of numeric attributes (see :func:`parse_task_line`).
+    * `use_mmap`: Map the data files into memory rather than reading them.
+
+    """
+    pattern = get_field_pattern(set(fields) | set(BASE_FIELDS))
+    for filename in DATA_FILES:
+        path = os.path.join(data_path, filename)
+        if not os.path.exists(path):
+            continue
+        for line in iter_lines(path, use_mmap=use_mmap):
+            record = parse_task_line(line, pattern, numeric)
+            if 'uuid' in record:
+                yield record
+
+
+def get_taskchampion_path(data_path):
+    """ Return the path of the TaskChampion replica in `data_path`, if any.
+    """
+    path = os.path.join(data_path, TASKCHAMPION_DB)
+    if os.path.exists(path):
+        return path
+    return None
+
+
+def read_taskchampion_tasks(data_path, fields, numeric=()):
+    """ Yield the tasks stored in the TaskChampion replica of `data_path`.
+
+    The replica is opened read-only.  Each task is stored as a JSON object
+    of strings; the requested attributes are extracted by SQLite itself so
+    that the other attributes (annotations in particular) never reach
+    Python.  Deleted and recurring template tasks are skipped.
+
+    :params:
+    * `data_path`: The taskwarrior data location.
+    * `fields`: Names of the attributes to read, in addition to
+      :data:`BASE_FIELDS`.
+    * `numeric`: Names of numeric attributes, which are returned as floats
+      just as ``task export`` returns numbers.
+
+    """
+    fields = sorted((set(fields) | set(BASE_FIELDS)) - set(['uuid']))
+    query = (
+        "SELECT uuid, %s FROM tasks "
+        "WHERE json_extract(data, '$.status') IN (%s)"
+    ) % (
+        ', '.join(['json_extract(data, ?)'] * len(fields)),
+        ', '.join(['?'] * len(TASKCHAMPION_STATUSES)),
+    )
+    parameters = ['$."%s"' % field for field in fields]
+    parameters.extend(TASKCHAMPION_STATUSES)
+
+    path = os.path.join(data_path, TASKCHAMPION_DB)
+    connection = sqlite3.connect(
+        'file:%s?mode=ro' % quote(path), uri=True)
+    try:
+        for row in connection.execute(query, parameters):
+            record = {'uuid': row[0]}
+            for field, value in zip(fields, row[1:]):
+                if value is None:
+                    continue
+                if field in numeric:
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        pass
+                record[field] = value
+            yield record
+    finally:
+        connection.close()
+
+
+def get_signature(data_path):
+    """ Return a value which changes whenever the tasks in `data_path` do.
+
+    This is the size and modification time of the data files, and for a
+    TaskChampion replica also the number of operations it recorded.
+    """
+    signature = []
+    path = get_taskchampion_path(data_path)
+    if path:
+        filenames = (TASKCHAMPION_DB, TASKCHAMPION_DB + '-wal')
+        connection = sqlite3.connect(
+            'file:%s?mode=ro' % quote(path), uri=True)
+        try:
+            signature.append(list(connection.execute(
+                'SELECT COUNT(*), MAX(rowid) FROM operations').fetchone()))
+        except sqlite3.Error as e:
+            log.debug("Unable to count operations: %s", e)
+        finally:
+            connection.close()
+    else:
+        filenames = DATA_FILES
+
+    for filename in filenames:
+        try:
+            stat = os.stat(os.path.join(data_path, filename))
+        except OSError:
+            signature.append([filename, None])
+        else:
+            signature.append([filename, stat.st_size, stat.st_mtime_ns])
+    return signature
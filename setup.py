@@ -31,6 +31,7 @@ setup(name='bugwarrior',
           "click",
           "dogpile.cache>=0.5.3",
           "future",
+          "importlib_metadata; python_version < '3.8'",
           "jinja2>=2.7.2",
           "lockfile>=0.9.1",
           "python-dateutil",
@@ -63,6 +63,8 @@ class ServiceTest(ConfigTest):
     GENERAL_CONFIG = {
         'annotation_length': 100,
         'description_length': 100,
+        # Keep responses from leaking between tests.
+        'metadata_cache_ttl': '0',
     }
     SERVICE_CONFIG = {
     }
@@ -1,5 +1,8 @@
 import os
 import logging
+import subprocess
+import sys
+import unittest
 from unittest import mock
 
 from click.testing import CliRunner
@@ -174,3 +177,45 @@ class TestPull(ConfigTest):
         # Assert that issues weren't closed or marked complete.
         self.assertNotIn('Closing 1 tasks', logs)
         self.assertNotIn('Completing task', logs)
+
+
+class TestStartup(unittest.TestCase):
+    # Slow to import, and only needed once issues are pulled and written.
+    LAZY_MODULES = (
+        'dateutil', 'dogpile', 'jinja2', 'pkg_resources', 'pytz', 'requests',
+        'taskw',
+    )
+
+    def get_import_times(self, module):
+        """ Return the modules imported by `module` with their import times.
+
+        Times are cumulative, in microseconds, as reported by
+        ``python -X importtime``.
+        """
+        output = subprocess.check_output(
+            [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+            stderr=subprocess.STDOUT, universal_newlines=True)
+        lines = [
+            line.split('|') for line in output.splitlines()
+            if line.startswith('import time:')
+        ][1:]
+
+        times = {}
+        for _, cumulative, name in reversed(lines):
+            # Nested imports are indented by two spaces per level.
+            nested = name.startswith('   ')
+            if name.strip() == module and not nested:
+                times[module] = int(cumulative)
+            elif times and nested:
+                times[name.strip()] = int(cumulative)
+            elif times:
+                break
+        return times
+
+    def test_lazy_imports(self):
+        times = self.get_import_times('bugwarrior')
+        for module in self.LAZY_MODULES:
+            self.assertNotIn(
+                module, times,
+                "%s is imported on startup, which takes %.1fms" % (
+                    module, times.get(module, 0) / 1000.))
@@ -1,6 +1,7 @@
 # coding: utf-8
 import os
-from unittest import TestCase
+import pickle
+from unittest import TestCase, mock
 
 from bugwarrior import config
 
@@ -108,6 +109,23 @@ class TestGetDataPath(ConfigTest):
 
         self.assertDataPath(os.path.expanduser('~/.task'))
 
+    def test_cached(self):
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.tempdir, 'cache')
+        with mock.patch.object(config, 'get_taskrc_data_location',
+                               return_value=self.lists_path) as location:
+            self.assertDataPath(self.lists_path)
+            self.assertDataPath(self.lists_path)
+            self.assertEqual(location.call_count, 1)
+
+            with open(self.taskrc, 'a') as fout:
+                fout.write('verbose=off\n')
+            self.assertDataPath(self.lists_path)
+            self.assertEqual(location.call_count, 2)
+
+            os.environ['TASKDATA'] = os.path.join(self.tempdir, 'data')
+            self.assertDataPath(self.lists_path)
+            self.assertEqual(location.call_count, 3)
+
 
 class TestOracleEval(TestCase):
 
@@ -115,6 +133,28 @@ class TestOracleEval(TestCase):
         self.assertEqual(config.oracle_eval("echo fööbår"), "fööbår")
 
 
+class TestCredentialBroker(TestCase):
+    def setUp(self):
+        self.config = config.BugwarriorConfigParser()
+
+    def test_memoized(self):
+        broker = config.get_credential_broker(self.config)
+        self.assertIs(config.get_credential_broker(self.config), broker)
+
+        with mock.patch.object(
+                config, 'get_service_password',
+                side_effect=['secret', 'other']) as get_service_password:
+            for _ in range(2):
+                self.assertEqual(broker.get_password(
+                    'github://ralph@github.com', 'ralph',
+                    '@oracle:eval:pass github'), 'secret')
+            self.assertEqual(broker.get_password(
+                'github://bob@github.com', 'bob',
+                '@oracle:eval:pass github'), 'other')
+
+        self.assertEqual(get_service_password.call_count, 2)
+
+
 class TestBugwarriorConfigParser(TestCase):
     def setUp(self):
         self.config = config.BugwarriorConfigParser()
@@ -176,6 +216,23 @@ class TestServiceConfig(TestCase):
             True
         )
 
+    def test_get_once(self):
+        with mock.patch.object(
+                self.config, 'get', wraps=self.config.get) as get:
+            for _ in range(2):
+                self.assertEqual(self.service_config.get('someint'), '4')
+                self.assertIsNone(self.service_config.get('someoption'))
+                self.assertNotIn('someoption', self.service_config)
+        # Interpolation makes calls of its own, with raw=True.
+        lookups = [call for call in get.call_args_list if not call[1]]
+        self.assertEqual(len(lookups), 2)
+
+    def test_pickle(self):
+        self.assertIsNone(self.service_config.get('someoption'))
+        service_config = pickle.loads(pickle.dumps(self.service_config))
+        self.assertEqual(service_config.get('someint'), '4')
+        self.assertIsNone(service_config.get('someoption'))
+
 
 class TestLoggingPath(TestCase):
     def setUp(self):
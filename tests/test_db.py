@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
 import copy
+import datetime
+import os
+import time
 import unittest
+from unittest import mock
 
+import pytz
+import taskw.fields
 import taskw.task
+import taskw.taskrc
+from taskw.exceptions import TaskwarriorError
 
 from bugwarrior.config import BugwarriorConfigParser
+from bugwarrior.data import BugwarriorData
 from bugwarrior import db
 
 from .base import ConfigTest
 
+UUIDS = ['00000000-0000-0000-0000-%012i' % i for i in range(6)]
+
 
 class TestMergeLeft(unittest.TestCase):
     def setUp(self):
@@ -41,6 +52,24 @@ class TestMergeLeft(unittest.TestCase):
         db.merge_left('annotations', self.issue_dict, remote, hamming=True)
         self.assertEqual(len(self.issue_dict['annotations']), 1)
 
+    def test_truncated_equality_hamming_true(self):
+        """ When hamming=True, entries truncated by either side match. """
+        local = {'annotations': ['@ralph - Hello world', '@bob - A long']}
+        remote = {'annotations': [
+            '@ralph - Hello', '@bob - A long comment', '@bob - Another']}
+
+        db.merge_left('annotations', local, remote, hamming=True)
+        self.assertEqual(local['annotations'], [
+            '@ralph - Hello world', '@bob - A long', '@bob - Another'])
+
+    def test_remote_duplicates(self):
+        """ Remote duplicates are added once to an existing field. """
+        local = {'annotations': ['testing']}
+        remote = {'annotations': ['other', 'other']}
+
+        db.merge_left('annotations', local, remote)
+        self.assertEqual(local['annotations'], ['testing', 'other'])
+
 class TestReplaceLeft(unittest.TestCase):
     def setUp(self):
         self.issue_dict = {'tags': ['test', 'test2'] }
@@ -70,6 +99,484 @@ class TestReplaceLeft(unittest.TestCase):
         db.replace_left('tags', self.issue_dict, self.remote, keeped_items)
         self.assertEqual(self.issue_dict, result)
 
+    def test_duplicates(self):
+        local = {'tags': ['a', 'b', 'a', 'c']}
+        remote = {'tags': ['a', 'd', 'a', 'a']}
+
+        db.replace_left('tags', local, remote)
+        self.assertEqual(local['tags'], ['a', 'a', 'd', 'a'])
+        self.assertEqual(remote['tags'], ['a', 'd', 'a', 'a'])
+
+
+class TestGetIssueFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.issue = {
+            'description': 'Some issue',
+            'entry': datetime.datetime(2020, 1, 1, tzinfo=pytz.utc),
+            'tags': ['one', 'two'],
+        }
+
+    def test_stable(self):
+        self.assertEqual(
+            db.get_issue_fingerprint(self.issue),
+            db.get_issue_fingerprint(dict(reversed(list(self.issue.items())))))
+
+    def test_changed_issue(self):
+        changed = dict(self.issue, tags=['one'])
+        self.assertNotEqual(
+            db.get_issue_fingerprint(self.issue),
+            db.get_issue_fingerprint(changed))
+
+    def test_changed_salt(self):
+        self.assertNotEqual(
+            db.get_issue_fingerprint(self.issue, ['priority']),
+            db.get_issue_fingerprint(self.issue, ['priority', 'project']))
+
+
+class TestUniqueIdentifier(unittest.TestCase):
+    def setUp(self):
+        self.keys = {
+            'github': ('githuburl', 'githubtype'),
+            'gitlab': ('gitlabrepo', 'gitlabtype', 'gitlabnumber'),
+        }
+        self.get_unique_identifier = db.UniqueIdentifier(self.keys)
+
+    def test_identifier(self):
+        issue = {
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+            'description': 'arbitrary',
+        }
+        self.assertEqual(
+            self.get_unique_identifier(dict, issue),
+            ('github', 'https://example.com/1', 'issue'))
+        self.assertEqual(self.get_unique_identifier.services, {dict: 'github'})
+
+    def test_service_changes_within_class(self):
+        self.get_unique_identifier(dict, {
+            'githuburl': 'https://example.com/1', 'githubtype': 'issue'})
+        self.assertEqual(
+            self.get_unique_identifier(dict, {
+                'gitlabrepo': 'arbitrary/repo',
+                'gitlabtype': 'issue',
+                'gitlabnumber': 1,
+            }),
+            ('gitlab', 'arbitrary/repo', 'issue', 1))
+
+    def test_no_keys(self):
+        with self.assertRaises(RuntimeError):
+            self.get_unique_identifier(dict, {'description': 'arbitrary'})
+
+
+class TestTaskIndex(unittest.TestCase):
+    def setUp(self):
+        self.keys = {
+            'github': ('githuburl', 'githubtype'),
+            'gitlab': ('gitlabrepo', 'gitlabtype', 'gitlabnumber'),
+        }
+        self.records = [{
+            'uuid': UUIDS[0],
+            'status': 'pending',
+            'description': 'Some issue',
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+        }, {
+            'uuid': UUIDS[1],
+            'status': 'pending',
+            'description': 'Some merge request',
+            'gitlabrepo': 'arbitrary/repo',
+            'gitlabtype': 'merge_request',
+            'gitlabnumber': 3.0,
+        }, {
+            'uuid': UUIDS[2],
+            'status': 'deleted',
+            'description': 'Some deleted issue',
+            'githuburl': 'https://example.com/2',
+            'githubtype': 'issue',
+        }]
+        self.index = db.TaskIndex(self.keys, self.records)
+
+    def find(self, issue):
+        issue.setdefault('description', 'arbitrary')
+        return db.find_taskwarrior_uuid(self.index, self.keys, issue)
+
+    def test_found(self):
+        self.assertEqual(self.find({
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+        }), UUIDS[0])
+
+    def test_numeric_key(self):
+        self.assertEqual(self.find({
+            'gitlabrepo': 'arbitrary/repo',
+            'gitlabtype': 'merge_request',
+            'gitlabnumber': 3,
+        }), UUIDS[1])
+
+    def test_not_found(self):
+        with self.assertRaises(db.NotFound):
+            self.find({
+                'githuburl': 'https://example.com/1',
+                'githubtype': 'pull_request',
+            })
+
+    def test_deleted_tasks_are_ignored(self):
+        with self.assertRaises(db.NotFound):
+            self.find({
+                'githuburl': 'https://example.com/2',
+                'githubtype': 'issue',
+            })
+
+    def test_completed_duplicates(self):
+        for uuid in UUIDS[3:5]:
+            self.index.add({
+                'uuid': uuid,
+                'status': 'completed',
+                'githuburl': 'https://example.com/3',
+                'githubtype': 'issue',
+            })
+        self.assertEqual(self.find({
+            'githuburl': 'https://example.com/3',
+            'githubtype': 'issue',
+        }), UUIDS[3])
+
+    def test_multiple_matches(self):
+        self.index.add({
+            'uuid': UUIDS[5],
+            'status': 'pending',
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+        })
+        with self.assertRaises(db.MultipleMatches):
+            self.find({
+                'githuburl': 'https://example.com/1',
+                'githubtype': 'issue',
+            })
+
+    def test_get_task(self):
+        task = self.index.get_task(UUIDS[0])
+        self.assertIsInstance(task, taskw.task.Task)
+        self.assertEqual(task['githuburl'], 'https://example.com/1')
+
+    def test_get_managed_uuids(self):
+        self.index.add({
+            'uuid': UUIDS[3],
+            'status': 'completed',
+            'githuburl': 'https://example.com/3',
+            'githubtype': 'issue',
+        })
+        self.index.add({
+            'uuid': UUIDS[4],
+            'status': 'waiting',
+            'githuburl': 'https://example.com/4',
+            'githubtype': 'issue',
+        })
+        self.index.add({
+            'uuid': UUIDS[5],
+            'status': 'pending',
+            'githuburl': 'https://example.com/5',
+        })
+        self.assertEqual(
+            self.index.get_managed_uuids({'github': self.keys['github']}),
+            set([UUIDS[0], UUIDS[4]]))
+        self.assertEqual(
+            self.index.get_managed_uuids(self.keys),
+            set([UUIDS[0], UUIDS[1], UUIDS[4]]))
+
+    def test_replace(self):
+        record = dict(self.records[0], githuburl='https://example.com/4')
+        self.index.add(record)
+        with self.assertRaises(db.NotFound):
+            self.find({
+                'githuburl': 'https://example.com/1',
+                'githubtype': 'issue',
+            })
+
+
+class TestTaskIndexFromDataFiles(ConfigTest):
+    def test_from_data_files(self):
+        with open(os.path.join(self.lists_path, 'pending.data'), 'w') as f:
+            f.write(
+                '[description:"Some issue" gitlabnumber:"3" '
+                'gitlabrepo:"arbitrary\\/repo" gitlabtype:"issue" '
+                'status:"pending" uuid:"%s"]\n' % UUIDS[0])
+        tw = mock.Mock()
+        tw.config.get_udas.return_value = {
+            'gitlabnumber': taskw.fields.NumericField(),
+        }
+        keys = {'gitlab': ('gitlabrepo', 'gitlabtype', 'gitlabnumber')}
+
+        index = db.TaskIndex.from_data_files(tw, keys, self.lists_path)
+
+        self.assertEqual(db.find_taskwarrior_uuid(index, keys, {
+            'description': 'Some issue',
+            'gitlabrepo': 'arbitrary/repo',
+            'gitlabtype': 'issue',
+            'gitlabnumber': 3,
+        }), UUIDS[0])
+        self.assertEqual(index.get_managed_uuids(keys), set([UUIDS[0]]))
+
+        tw.get_task.return_value = (1, mock.sentinel.task)
+        self.assertEqual(index.get_task(UUIDS[0]), mock.sentinel.task)
+        tw.get_task.assert_called_once_with(uuid=UUIDS[0])
+
+
+class TestPersistedTaskIndex(ConfigTest):
+    def setUp(self):
+        super(TestPersistedTaskIndex, self).setUp()
+        self.keys = {'github': ('githuburl', 'githubtype')}
+        self.path = os.path.join(self.lists_path, db.INDEX_FILE)
+        self.tw = mock.Mock()
+        self.tw.config.get_udas.return_value = {}
+        self.index = db.TaskIndex(self.keys, [{
+            'uuid': UUIDS[0],
+            'status': 'pending',
+            'description': 'Some issue',
+            'entry': '20200101T000000Z',
+            'annotations': [{'entry': '20200101T000000Z', 'description': 'a'}],
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+            db.FINGERPRINT: 'abc',
+        }])
+
+    def signature(self):
+        return db.get_index_signature(self.keys, self.lists_path)
+
+    def test_round_trip(self):
+        self.index.save(self.path, self.signature())
+        index = db.TaskIndex.load(
+            self.tw, self.keys, self.path, self.signature())
+
+        self.assertEqual(index.get_record(UUIDS[0]), {
+            'uuid': UUIDS[0],
+            'status': 'pending',
+            'description': 'Some issue',
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+            db.FINGERPRINT: 'abc',
+        })
+        self.assertEqual(db.find_taskwarrior_uuid(index, self.keys, {
+            'description': 'Some issue',
+            'githuburl': 'https://example.com/1',
+            'githubtype': 'issue',
+        }), UUIDS[0])
+
+    def test_outdated(self):
+        self.index.save(self.path, self.signature())
+        with open(os.path.join(self.lists_path, 'pending.data'), 'w') as f:
+            f.write('[description:"New task" status:"pending"]\n')
+        self.assertIsNone(db.TaskIndex.load(
+            self.tw, self.keys, self.path, self.signature()))
+
+    def test_keys_changed(self):
+        self.index.save(self.path, self.signature())
+        self.keys['gitlab'] = ('gitlaburl',)
+        self.assertIsNone(db.TaskIndex.load(
+            self.tw, self.keys, self.path, self.signature()))
+
+    def test_missing(self):
+        self.assertIsNone(db.TaskIndex.load(
+            self.tw, self.keys, self.path, self.signature()))
+
+    def test_new_task(self):
+        record = db.get_import_record({
+            'uuid': UUIDS[1],
+            'description': 'New issue',
+            'githuburl': 'https://example.com/2',
+            'githubtype': 'issue',
+        })
+        self.index.add(record)
+        self.index.save(self.path, self.signature())
+        index = db.TaskIndex.load(
+            self.tw, self.keys, self.path, self.signature())
+
+        self.assertEqual(db.find_taskwarrior_uuid(index, self.keys, {
+            'description': 'New issue',
+            'githuburl': 'https://example.com/2',
+            'githubtype': 'issue',
+        }), UUIDS[1])
+
+
+class TestGetTaskStore(ConfigTest):
+    def setUp(self):
+        super(TestGetTaskStore, self).setUp()
+        self.config = BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.data = BugwarriorData(self.lists_path)
+
+    def test_export(self):
+        self.config.set('general', 'task_store', 'export')
+        self.assertEqual(
+            db.get_task_store(self.config, 'general'), ('export', None))
+
+    def test_files(self):
+        self.config.set('general', 'task_store', 'files')
+        self.assertEqual(
+            db.get_task_store(self.config, 'general'),
+            ('files', self.lists_path))
+
+    def test_auto(self):
+        self.assertEqual(
+            db.get_task_store(self.config, 'general'),
+            ('export', self.lists_path))
+
+        open(os.path.join(self.lists_path, 'taskchampion.sqlite3'), 'w').close()
+        self.assertEqual(
+            db.get_task_store(self.config, 'general'),
+            ('taskchampion', self.lists_path))
+
+
+class TestGetImportRecord(unittest.TestCase):
+    def test_new_issue(self):
+        record = db.get_import_record({
+            'description': 'Some issue',
+            'project': 'sample_project',
+            'priority': None,
+            'tags': [],
+            'annotations': ['@ralphbean - First', '@ralphbean - Second'],
+            'entry': datetime.datetime(2020, 1, 1, tzinfo=pytz.utc),
+            'githubnumber': 10,
+        })
+        annotations = record.pop('annotations')
+        self.assertEqual(record, {
+            'description': 'Some issue',
+            'project': 'sample_project',
+            'status': 'pending',
+            'entry': '20200101T000000Z',
+            'githubnumber': 10,
+        })
+        self.assertEqual(
+            [a['description'] for a in annotations],
+            ['@ralphbean - First', '@ralphbean - Second'])
+        self.assertEqual(len(set(a['entry'] for a in annotations)), 2)
+
+    def test_closed_issue(self):
+        record = db.get_import_record({
+            'description': 'Some issue',
+            'end': datetime.datetime(2020, 1, 1, tzinfo=pytz.utc),
+        })
+        self.assertEqual(record['status'], 'completed')
+        self.assertEqual(record['end'], '20200101T000000Z')
+
+    def test_existing_task(self):
+        task = taskw.task.Task({
+            'id': 1,
+            'uuid': UUIDS[0],
+            'urgency': 4.9,
+            'status': 'pending',
+            'description': 'Some issue',
+            'annotations': [{
+                'entry': '20200101T000000Z',
+                'description': 'Old annotation',
+            }],
+        })
+        task['annotations'].append('New annotation')
+        record = db.get_import_record(task)
+        self.assertEqual(record['uuid'], UUIDS[0])
+        self.assertNotIn('id', record)
+        self.assertNotIn('urgency', record)
+        self.assertEqual(record['annotations'][0], {
+            'entry': '20200101T000000Z',
+            'description': 'Old annotation',
+        })
+        self.assertEqual(
+            record['annotations'][1]['description'], 'New annotation')
+
+
+class TestTaskImporter(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.importer = db.TaskImporter(mock.Mock(), batch_size=2)
+        self.importer._import = self.batches.append
+
+    def test_batches(self):
+        uuids = [
+            self.importer.add({'description': str(i)}) for i in range(3)]
+        self.assertEqual(len(self.batches), 1)
+        self.importer.flush()
+        self.assertEqual(len(self.batches), 2)
+        self.assertEqual(
+            [r['uuid'] for batch in self.batches for r in batch], uuids)
+        self.assertEqual([r['uuid'] for r in self.importer.imported], uuids)
+
+    def test_existing_uuid_is_kept(self):
+        self.importer.add({'uuid': UUIDS[0], 'description': 'arbitrary'})
+        self.importer.flush()
+        self.assertEqual(self.batches[0][0]['uuid'], UUIDS[0])
+
+    def test_errors_per_task(self):
+        def _import(records):
+            if any(r['description'] == 'bad' for r in records):
+                raise TaskwarriorError(['task'], 'bad task', '', 2)
+            self.batches.append(records)
+        self.importer._import = _import
+
+        self.importer.add({'description': 'good'})
+        bad = self.importer.add({'description': 'bad'})
+
+        self.assertEqual(self.importer.failed, {bad: 'bad task'})
+        self.assertEqual(
+            [[r['description'] for r in batch] for batch in self.batches],
+            [['good']])
+        self.assertEqual(
+            [r['description'] for r in self.importer.imported], ['good'])
+
+
+class TestBackgroundTaskImporter(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.importer = db.BackgroundTaskImporter(
+            mock.Mock(), batch_size=2, flush_interval=0.01)
+        self.importer._import = self.batches.append
+
+    def tearDown(self):
+        if self.importer.error is None:
+            self.importer.close()
+
+    def test_flush(self):
+        uuids = [
+            self.importer.add({'description': str(i)}) for i in range(3)]
+        self.importer.flush()
+        self.assertEqual(len(self.batches), 2)
+        self.assertEqual(
+            [r['uuid'] for batch in self.batches for r in batch], uuids)
+        self.assertEqual([r['uuid'] for r in self.importer.imported], uuids)
+
+    def test_partial_batch_is_written_when_idle(self):
+        self.importer.add({'description': 'arbitrary'})
+        for _ in range(500):
+            if self.batches:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.batches), 1)
+
+    def test_failed_batch(self):
+        def _import(records):
+            raise OSError("No such file or directory: 'task'")
+        self.importer._import = _import
+
+        uuid = self.importer.add({'description': 'arbitrary'})
+        # Written when idle, then again by flush.
+        time.sleep(0.05)
+        self.importer.flush()
+
+        self.assertEqual(self.importer.failed, {
+            uuid: "No such file or directory: 'task'"})
+        self.assertTrue(self.importer.thread.is_alive())
+
+    def test_stopped_writer(self):
+        def _import(records):
+            raise KeyboardInterrupt()
+        self.importer._import = _import
+
+        self.importer.add({'description': 'arbitrary'})
+        with self.assertRaises(RuntimeError):
+            self.importer.flush()
+        with self.assertRaises(RuntimeError):
+            self.importer.add({'description': 'arbitrary'})
+        with self.assertRaises(RuntimeError):
+            self.importer.close()
+
 
 class TestSynchronize(ConfigTest):
 
@@ -81,6 +588,7 @@ class TestSynchronize(ConfigTest):
                     del task['modified']
                     del task['entry']
                     del task['uuid']
+                    del task[db.FINGERPRINT]
 
             return tasks
 
@@ -190,6 +698,96 @@ class TestSynchronize(ConfigTest):
                 u'urgency': 4.9,
             }]})
 
+    def test_synchronize_unchanged(self):
+        rawconfig = BugwarriorConfigParser()
+        rawconfig.add_section('general')
+        rawconfig.set('general', 'targets', 'my_service')
+        rawconfig.add_section('my_service')
+        rawconfig.set('my_service', 'service', 'github')
+
+        issue = {
+            'description': 'Blah blah blah.',
+            'project': 'sample_project',
+            'githubtype': 'issue',
+            'githuburl': 'https://example.com',
+            'priority': 'M',
+        }
+        counts = db.synchronize(iter((issue,)), rawconfig, 'general')
+        self.assertEqual(counts['new'], 1)
+
+        # Nothing changed upstream: the task is neither read nor written.
+        with mock.patch.object(db.TaskIndex, 'get_task') as get_task, \
+                mock.patch.object(db.TaskImporter, 'add') as add:
+            counts = db.synchronize(
+                iter((dict(issue), )), rawconfig, 'general')
+        get_task.assert_not_called()
+        add.assert_not_called()
+        self.assertEqual(counts, {
+            'new': 0, 'existing': 1, 'changed': 0, 'closed': 0})
+
+        # A changed field still updates the task.
+        issue['description'] = 'Yada yada yada.'
+        counts = db.synchronize(iter((dict(issue), )), rawconfig, 'general')
+        self.assertEqual(counts, {
+            'new': 0, 'existing': 0, 'changed': 1, 'closed': 0})
+
+        tw = taskw.TaskWarrior(self.taskrc)
+        tasks = tw.load_tasks()['pending']
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0]['description'], 'Yada yada yada.')
+        self.assertEqual(
+            tasks[0][db.FINGERPRINT],
+            db.get_issue_fingerprint(dict(issue), [
+                ['priority'], [], True, True, False]))
+
+    def test_synchronize_persisted_index(self):
+        rawconfig = BugwarriorConfigParser()
+        rawconfig.add_section('general')
+        rawconfig.set('general', 'targets', 'my_service')
+        rawconfig.set('general', 'persist_index', 'True')
+        rawconfig.add_section('my_service')
+        rawconfig.set('my_service', 'service', 'github')
+
+        issue = {
+            'description': 'Blah blah blah.',
+            'project': 'sample_project',
+            'githubtype': 'issue',
+            'githuburl': 'https://example.com',
+            'priority': 'M',
+        }
+        counts = db.synchronize(iter((dict(issue), )), rawconfig, 'general')
+        self.assertEqual(counts['new'], 1)
+
+        # The second run matches the task through the saved index.
+        with mock.patch.object(db.TaskIndex, 'from_taskwarrior') as export:
+            counts = db.synchronize(
+                iter((dict(issue), )), rawconfig, 'general')
+        export.assert_not_called()
+        self.assertEqual(counts, {
+            'new': 0, 'existing': 1, 'changed': 0, 'closed': 0})
+
+        tw = taskw.TaskWarrior(self.taskrc)
+        self.assertEqual(len(tw.load_tasks()['pending']), 1)
+
+    def test_synchronize_dry_run(self):
+        rawconfig = BugwarriorConfigParser()
+        rawconfig.add_section('general')
+        rawconfig.set('general', 'targets', 'my_service')
+        rawconfig.add_section('my_service')
+        rawconfig.set('my_service', 'service', 'github')
+
+        db.synchronize(iter(()), rawconfig, 'general', dry_run=True)
+
+        self.assertEqual(os.listdir(self.lists_path), [])
+
+
+class TestCacheRegion(unittest.TestCase):
+    def test_alias(self):
+        region = mock.Mock()
+        from bugwarrior.db import CACHE_REGION
+        with mock.patch.object(db, '_cache_region', region):
+            self.assertIs(
+                CACHE_REGION.cache_on_arguments, region.cache_on_arguments)
 
 class TestUDAs(ConfigTest):
     def test_udas(self):
@@ -202,6 +800,8 @@ class TestUDAs(ConfigTest):
         udas = sorted(list(
             db.get_defined_udas_as_strings(rawconfig, 'general')))
         self.assertEqual(udas, [
+            u'uda.bwfingerprint.label=Bugwarrior Fingerprint',
+            u'uda.bwfingerprint.type=string',
             u'uda.githubbody.label=Github Body',
             u'uda.githubbody.type=string',
             u'uda.githubclosedon.label=GitHub Closed',
@@ -229,3 +829,45 @@ class TestUDAs(ConfigTest):
             u'uda.githubuser.label=Github User',
             u'uda.githubuser.type=string',
         ])
+
+
+class TestTaskrcWithUdas(ConfigTest):
+    def setUp(self):
+        super(TestTaskrcWithUdas, self).setUp()
+        self.uda_list = {'uda': {
+            'githubnumber': {'type': 'numeric', 'label': 'Github Number'},
+        }}
+
+    def test_taskrc(self):
+        taskrc, overrides = db.get_taskrc_with_udas(
+            self.taskrc, self.uda_list, self.lists_path)
+
+        self.assertIsNone(overrides)
+        config = taskw.taskrc.TaskRc(taskrc)
+        self.assertEqual(config['data']['location'], self.lists_path)
+        self.assertIsInstance(
+            config.get_udas()['githubnumber'], taskw.fields.NumericField)
+
+    def test_cached(self):
+        taskrc, _ = db.get_taskrc_with_udas(
+            self.taskrc, self.uda_list, self.lists_path)
+        os.chmod(taskrc, 0o400)
+        self.assertEqual(db.get_taskrc_with_udas(
+            self.taskrc, self.uda_list, self.lists_path)[0], taskrc)
+
+        # Changed UDAs are written to the same file.
+        self.uda_list['uda']['githubnumber']['label'] = 'Number'
+        self.assertEqual(db.get_taskrc_with_udas(
+            self.taskrc, self.uda_list, self.lists_path)[0], taskrc)
+        self.assertIn(
+            'uda.githubnumber.label=Number\n',
+            open(db.write_uda_taskrc(self.lists_path, self.uda_list)).read())
+        self.assertEqual(
+            sorted(os.listdir(self.lists_path)),
+            ['bugwarrior-general-udas.taskrc', 'bugwarrior-general.taskrc'])
+
+    def test_whitespace(self):
+        taskrc = os.path.join(self.tempdir, 'my taskrc')
+        self.assertEqual(
+            db.get_taskrc_with_udas(taskrc, self.uda_list, self.lists_path),
+            (taskrc, self.uda_list))
@@ -132,7 +132,7 @@ class TestJiraIssue(AbstractServiceTest, ServiceTest):
         def get_url(*args):
             return arbitrary_url
 
-        with mock.patch.object(issue, 'get_url', side_effect=get_url):
+        with mock.patch.object(type(issue), 'get_url', side_effect=get_url):
             actual_output = issue.to_taskwarrior()
 
         self.assertEqual(actual_output, expected_output)
@@ -179,7 +179,7 @@ class TestJiraIssue(AbstractServiceTest, ServiceTest):
         def get_url(*args):
             return arbitrary_url
 
-        with mock.patch.object(issue, 'get_url', side_effect=get_url):
+        with mock.patch.object(type(issue), 'get_url', side_effect=get_url):
             actual_output = issue.to_taskwarrior()
 
         self.assertEqual(actual_output, expected_output)
@@ -1,6 +1,15 @@
+import sys
+import threading
+import time
+import timeit
 import unittest
+from unittest import mock
+
+from dateutil.parser import parse as dateutil_parse
+from dogpile.cache import make_region
 
 from bugwarrior import config, services
+from bugwarrior.services.github import GithubIssue, GithubService
 
 LONG_MESSAGE = """\
 Some message that is over 100 characters. This message is so long it's
@@ -23,6 +32,9 @@ class DumbIssueService(services.IssueService):
     """
     Implement the required methods but they shouldn't be called.
     """
+    ISSUE_CLASS = DumbIssue
+    CONFIG_PREFIX = 'dumb'
+
     def get_owner(self, issue):
         raise NotImplementedError
 
@@ -68,6 +80,41 @@ class TestIssueService(unittest.TestCase):
             u'@some_author - {message}'.format(message=LONG_MESSAGE)])
 
 
+    def test_map_concurrently(self):
+        self.config.set('general', 'annotation_concurrency', '4')
+        service = DumbIssueService(self.config, 'general', 'test')
+        lock = threading.Lock()
+        running = []
+        most_running = []
+
+        def fetch(item):
+            with lock:
+                running.append(item)
+                most_running.append(len(running))
+            # Finish in the reverse order.
+            time.sleep(0.01 * (10 - item))
+            with lock:
+                running.remove(item)
+            return item * 2
+
+        results = list(service.map_concurrently(fetch, iter(range(10))))
+        self.assertEqual(results, [item * 2 for item in range(10)])
+        self.assertGreater(max(most_running), 1)
+        self.assertLessEqual(max(most_running), 4)
+
+    def test_map_concurrently_target_option(self):
+        self.config.set('general', 'annotation_concurrency', '4')
+        self.config.add_section('test')
+        self.config.set('test', 'dumb.annotation_concurrency', '1')
+        service = DumbIssueService(self.config, 'general', 'test')
+        self.assertEqual(service.annotation_concurrency, 1)
+
+        threads = set()
+        list(service.map_concurrently(
+            lambda item: threads.add(threading.current_thread()), range(3)))
+        self.assertEqual(threads, {threading.current_thread()})
+
+
 class TestIssue(unittest.TestCase):
     def setUp(self):
         super(TestIssue, self).setUp()
@@ -101,3 +148,344 @@ class TestIssue(unittest.TestCase):
         description = issue.build_default_description(LONG_MESSAGE)
         self.assertEqual(
             description, u'(bw)Is# - {message}'.format(message=LONG_MESSAGE))
+
+    def test_record_is_memoized(self):
+        self.config.add_section('test')
+        self.config.set('test', 'dumb.description_template', '{{title}}')
+        service = DumbIssueService(self.config, 'general', 'test')
+        issue = service.get_issue_for_record(None, {'title': 'Old title'})
+        issue.to_taskwarrior = mock.Mock(return_value={'priority': 'M'})
+        issue.get_default_description = mock.Mock(return_value='Default')
+
+        self.assertEqual(dict(issue)['description'], 'Old title')
+        self.assertEqual(issue['priority'], 'M')
+        self.assertEqual(issue.to_taskwarrior.call_count, 1)
+        self.assertEqual(issue.get_default_description.call_count, 1)
+
+        record = issue.get_taskwarrior_record()
+        record['tags'].append('modified')
+        self.assertEqual(issue['tags'], [])
+
+        issue.update_extra({'title': 'New title'})
+        self.assertEqual(issue['description'], 'New title')
+        self.assertEqual(issue.to_taskwarrior.call_count, 2)
+
+    def test_materialize(self):
+        self.config.add_section('test')
+        service = DumbIssueService(self.config, 'general', 'test')
+        issue = service.get_issue_for_record({'title': 'Title'})
+        issue.to_taskwarrior = mock.Mock(return_value={'priority': 'M'})
+        issue.get_default_description = mock.Mock(return_value='Default')
+        self.assertIs(issue.origin, service.get_issue_for_record({}).origin)
+
+        record = issue.materialize()
+        self.assertEqual(record['description'], 'Default')
+        self.assertIsNone(issue.record)
+        self.assertEqual(dict(issue), record)
+
+    def test_slots(self):
+        issue = GithubIssue({}, origin={}, extra={})
+        self.assertFalse(hasattr(issue, '__dict__'))
+
+
+class MetadataService(DumbIssueService):
+    def __init__(self, *args):
+        super(MetadataService, self).__init__(*args)
+        self.calls = 0
+
+    @services.metadata_cache(ttl=60)
+    def get_projects(self, account):
+        self.calls += 1
+        return [account, self.calls]
+
+    @services.metadata_cache()
+    def get_labels(self):
+        self.calls += 1
+        return self.calls
+
+
+class TestMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.config = config.BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.add_section('test')
+        self.config.set('test', 'dumb.url', 'https://example.com')
+
+        region = make_region().configure('dogpile.cache.memory')
+        patcher = mock.patch.object(
+            services, 'get_cache_region', return_value=region)
+        self.region = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cached(self):
+        service = MetadataService(self.config, 'general', 'test')
+        self.assertEqual(service.get_projects('a'), ['a', 1])
+        self.assertEqual(service.get_projects('a'), ['a', 1])
+        self.assertEqual(service.get_projects('b'), ['b', 2])
+
+        # Shared between runs.
+        service = MetadataService(self.config, 'general', 'test')
+        self.assertEqual(service.get_projects('a'), ['a', 1])
+        self.assertEqual(service.calls, 0)
+
+    def test_target_options(self):
+        service = MetadataService(self.config, 'general', 'test')
+        service.get_projects('a')
+
+        self.config.set('test', 'dumb.url', 'https://example.org')
+        service = MetadataService(self.config, 'general', 'test')
+        self.assertEqual(service.get_projects('a'), ['a', 1])
+        self.assertEqual(service.calls, 1)
+
+    def test_disabled(self):
+        self.config.set('test', 'dumb.metadata_cache_ttl', '0')
+        service = MetadataService(self.config, 'general', 'test')
+        service.get_projects('a')
+        service.get_projects('a')
+        self.assertEqual(service.calls, 2)
+        self.region.assert_not_called()
+
+    def test_off_by_default(self):
+        service = MetadataService(self.config, 'general', 'test')
+        service.get_labels()
+        service.get_labels()
+        self.assertEqual(service.calls, 2)
+
+        self.config.set('general', 'metadata_cache_ttl', '3600')
+        service = MetadataService(self.config, 'general', 'test')
+        service.get_labels()
+        service.get_labels()
+        self.assertEqual(service.calls, 1)
+
+
+class TestGetService(unittest.TestCase):
+    def test_get_service(self):
+        self.assertIs(services.get_service('github'), GithubService)
+        self.assertIsNone(services.get_service('nosuchservice'))
+
+    def test_entry_points_are_read_once(self):
+        services.get_service_entry_points()
+        with mock.patch.object(services, 'entry_points') as entry_points:
+            services.get_service('gitlab')
+        entry_points.assert_not_called()
+
+
+class TestParseDate(unittest.TestCase):
+    DATES = [
+        '2019-02-07T16:22:53Z',  # GitHub
+        '2018-12-02T12:59:00.000Z',  # GitLab
+        '2016-06-06T06:07:08.123-0700',  # Jira
+        '2019-02-07T16:22:53.1534567Z',  # Azure DevOps
+        '2018-12-02T12:59:00+05:30',
+        '2018-12-02 12:59:00',
+        '2018-12-02',
+    ]
+
+    def setUp(self):
+        self.issue = DumbIssue({}, origin={})
+
+    def test_same_as_dateutil(self):
+        for date in self.DATES:
+            parsed = self.issue.parse_date(date)
+            expected = dateutil_parse(date)
+            if not expected.tzinfo:
+                expected = expected.replace(tzinfo=services.get_tzinfo('UTC'))
+            self.assertEqual(parsed, expected)
+            self.assertEqual(parsed.utcoffset(), expected.utcoffset())
+
+    def test_fallback(self):
+        self.assertEqual(
+            self.issue.parse_date('Tue, 5 Feb 2019 10:00:00 +0100'),
+            dateutil_parse('2019-02-05T10:00:00+01:00'))
+
+    def test_timezones(self):
+        self.assertIs(
+            services.get_tzinfo('Europe/Paris'),
+            services.get_tzinfo('Europe/Paris'))
+        self.assertEqual(
+            self.issue.parse_date('2018-12-02', 'Europe/Paris').tzinfo.zone,
+            'Europe/Paris')
+
+    def test_benchmark(self):
+        """ Report how long parsing the dates of an issue takes compared to
+        dateutil (shown with ``pytest -s``).  Timings vary too much between
+        machines to assert on them. """
+        def parse_with_dateutil():
+            for date in self.DATES[:4]:
+                dateutil_parse(date)
+
+        def parse():
+            for date in self.DATES[:4]:
+                self.issue.parse_date(date)
+
+        timings = [
+            min(timeit.repeat(function, number=100, repeat=3))
+            for function in (parse, parse_with_dateutil)]
+        print("\nparse_date: %.2fms, dateutil: %.2fms per 100 issues" % (
+            timings[0] * 1000, timings[1] * 1000))
+
+
+class FakeService(object):
+    """
+    Yield a single issue per target, counting how many run at once.
+    """
+    CONFIG_PREFIX = 'fake'
+    PASSWORD_OPTIONS = {}
+    lock = threading.Lock()
+    running = 0
+    most_running = 0
+
+    def __init__(self, config, main_section, target):
+        self.target = target
+
+    @staticmethod
+    def get_keyring_service(service_config):
+        return 'fake://'
+
+    def issues(self):
+        with self.lock:
+            FakeService.running += 1
+            FakeService.most_running = max(
+                FakeService.most_running, FakeService.running)
+        time.sleep(0.05)
+        with self.lock:
+            FakeService.running -= 1
+        if self.target == 'broken':
+            raise ValueError('broken')
+        yield {'target': self.target}
+
+
+class PasswordService(FakeService):
+    """
+    Yield the token of each target, and whether it was resolved already.
+    """
+    PASSWORD_OPTIONS = {'token': None}
+
+    def __init__(self, config, main_section, target):
+        super(PasswordService, self).__init__(config, main_section, target)
+        self.config = config
+
+    def issues(self):
+        oracle = config.ServiceConfig(
+            self.CONFIG_PREFIX, self.config, self.target).get('token')
+        broker = config.get_credential_broker(self.config)
+        key = (self.get_keyring_service(None), 'nousername', oracle)
+        yield {
+            'target': self.target,
+            'prefetched': key in broker.passwords,
+            'token': broker.get_password(*key),
+        }
+
+
+class TestAggregateIssues(unittest.TestCase):
+    def setUp(self):
+        super(TestAggregateIssues, self).setUp()
+        FakeService.most_running = 0
+        self.config = config.BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.set('general', 'worker_backend', 'thread')
+        self.targets = ['one', 'two', 'broken', 'three', 'four']
+        self.config.set('general', 'targets', ', '.join(self.targets))
+        for target in self.targets:
+            self.config.add_section(target)
+            self.config.set(target, 'service', 'fake')
+
+    def aggregate(self):
+        with mock.patch.object(services, 'get_service', lambda _: FakeService):
+            return list(services.aggregate_issues(
+                self.config, 'general', debug=False))
+
+    def test_max_workers(self):
+        self.config.set('general', 'max_workers', '2')
+        issues = self.aggregate()
+
+        self.assertEqual(FakeService.most_running, 2)
+        self.assertIn(('SERVICE FAILED', 'broken'), issues)
+        self.assertEqual(
+            sorted(issue['target'] for issue in issues
+                   if isinstance(issue, dict)),
+            ['four', 'one', 'three', 'two'])
+
+    def test_passwords_are_prefetched(self):
+        self.config.set('general', 'worker_backend', 'process')
+        for target in self.targets:
+            self.config.set(target, 'fake.token', '@oracle:eval:echo secret')
+        self.config.interactive = False
+
+        with mock.patch.object(services, 'get_service',
+                               lambda _: PasswordService), \
+                mock.patch('bugwarrior.config.oracle_eval',
+                           return_value='secret') as oracle_eval:
+            issues = list(services.aggregate_issues(
+                self.config, 'general', debug=False))
+
+        # Resolved once in the parent, for all targets sharing it...
+        oracle_eval.assert_called_once_with('echo secret')
+        # ...and handed to the workers, which didn't resolve it again.
+        self.assertEqual(
+            sorted(issues, key=lambda issue: issue['target']), [
+                {'target': target, 'prefetched': True, 'token': 'secret'}
+                for target in sorted(self.targets)])
+
+    def test_password_failures_stay_with_their_target(self):
+        for target in self.targets:
+            self.config.set(target, 'fake.token', '@oracle:eval:echo secret')
+        self.config.set('broken', 'fake.token', '@oracle:eval:false')
+        self.config.interactive = False
+
+        def oracle_eval(command):
+            if command == 'false':
+                sys.exit(1)
+            return 'secret'
+
+        with mock.patch.object(services, 'get_service',
+                               lambda _: PasswordService), \
+                mock.patch('bugwarrior.config.oracle_eval', oracle_eval):
+            self.assertEqual(
+                services.prefetch_passwords(self.config, self.targets),
+                ['broken'])
+            issues = list(services.aggregate_issues(
+                self.config, 'general', debug=False))
+
+        self.assertIn(('SERVICE FAILED', 'broken'), issues)
+        self.assertEqual(
+            sorted(issue['target'] for issue in issues
+                   if isinstance(issue, dict)),
+            ['four', 'one', 'three', 'two'])
+
+    def test_keyring_lookups_are_staggered(self):
+        self.config.set('general', 'max_workers', '2')
+        with mock.patch.object(services, 'get_service',
+                               lambda _: PasswordService), \
+                mock.patch.object(threading.Thread, 'start'), \
+                mock.patch.object(services.time, 'sleep') as sleep:
+            self.assertEqual(
+                services.prefetch_passwords(self.config, self.targets),
+                self.targets)
+            services.aggregate_issues(self.config, 'general', debug=False)
+        sleep.assert_called_once_with(1)
+
+    def test_record_chunks(self):
+        self.config.set('general', 'record_chunk_size', '2')
+        with mock.patch.object(services, 'dump_records',
+                               wraps=services.dump_records) as dump_records:
+            issues = self.aggregate()
+
+        self.assertEqual(dump_records.call_count, 4)
+        self.assertIn(('SERVICE FAILED', 'broken'), issues)
+        self.assertEqual(
+            sorted(issue['target'] for issue in issues
+                   if isinstance(issue, dict)),
+            ['four', 'one', 'three', 'two'])
+
+    def test_workers_start_before_iterating(self):
+        self.config.set('general', 'max_workers', '2')
+        with mock.patch.object(services, 'get_service',
+                               lambda _: FakeService), \
+                mock.patch.object(threading.Thread, 'start') as start:
+            services.aggregate_issues(self.config, 'general', debug=False)
+        self.assertEqual(start.call_count, 2)
+
+    def test_all_at_once(self):
+        self.aggregate()
+        self.assertEqual(FakeService.most_running, len(self.targets))
@@ -0,0 +1,278 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+import responses
+
+from bugwarrior import config, sessions
+from bugwarrior.data import BugwarriorData
+
+
+class TestSessions(unittest.TestCase):
+    def setUp(self):
+        self.config = config.BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.set('general', 'http_backoff_factor', '0')
+        sessions.configure(self.config, 'general')
+
+    def tearDown(self):
+        sessions.configure(self.config, 'nosection')
+
+    def test_configure(self):
+        self.config.set('general', 'http_pool_size', '2')
+        self.config.set('general', 'http_retries', '')
+        sessions.configure(self.config, 'general')
+
+        adapter = sessions.get_adapter()
+        self.assertEqual(adapter._pool_maxsize, 2)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0)
+
+    def test_shared_adapter(self):
+        first, second = sessions.get_session(), sessions.get_session()
+        self.assertIsNot(first, second)
+        self.assertIs(
+            first.get_adapter('https://example.com/'),
+            second.get_adapter('https://example.com/'))
+
+    @responses.activate
+    def test_retry(self):
+        responses.add(responses.GET, 'https://example.com/', status=503)
+        responses.add(responses.GET, 'https://example.com/', json={})
+        response = sessions.get_session().get('https://example.com/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_retries_exhausted(self):
+        self.config.set('general', 'http_retries', '1')
+        sessions.configure(self.config, 'general')
+        responses.add(responses.GET, 'https://example.com/', status=503)
+        response = sessions.get_session().get('https://example.com/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(responses.calls), 2)
+
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.config = config.BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.set('general', 'http_cache', 'True')
+        self.config.data = BugwarriorData(self.tempdir)
+        sessions.configure(self.config, 'general')
+
+    def tearDown(self):
+        sessions.configure(self.config, 'nosection')
+        shutil.rmtree(self.tempdir)
+
+    def get(self, url, **kwargs):
+        return sessions.get_session().get(url, **kwargs)
+
+    def test_configure(self):
+        self.assertEqual(
+            sessions.get_adapter().cache.path,
+            os.path.join(self.tempdir, 'bugwarrior-http-cache.sqlite3'))
+
+    @responses.activate
+    def test_replay(self):
+        responses.add(
+            responses.GET, 'https://example.com/', json={'a': 1},
+            headers={'ETag': '"abc"', 'Link': '<https://example.com/2>'})
+        responses.add(responses.GET, 'https://example.com/', status=304)
+
+        self.assertEqual(self.get('https://example.com/').json(), {'a': 1})
+        response = self.get('https://example.com/')
+
+        self.assertEqual(
+            responses.calls[1].request.headers['If-None-Match'], '"abc"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'a': 1})
+        self.assertEqual(response.headers['Link'], '<https://example.com/2>')
+        self.assertEqual(sessions.get_cache_stats(), (1, 1))
+
+    @responses.activate
+    def test_replay_iter_content(self):
+        responses.add(
+            responses.GET, 'https://example.com/', body=b'a\nb',
+            headers={'ETag': '"abc"'})
+        responses.add(responses.GET, 'https://example.com/', status=304)
+
+        self.get('https://example.com/')
+        # Sessions read the content of the response right away; other
+        # callers of the adapter may not.
+        response = sessions.get_adapter().send(
+            requests.Request('GET', 'https://example.com/').prepare())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.iter_content(1)), b'a\nb')
+        self.assertEqual(list(response.iter_lines()), [b'a', b'b'])
+
+    @responses.activate
+    def test_changed(self):
+        responses.add(
+            responses.GET, 'https://example.com/', json={'a': 1},
+            headers={'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        responses.add(
+            responses.GET, 'https://example.com/', json={'a': 2},
+            headers={'Last-Modified': 'Thu, 22 Oct 2015 07:28:00 GMT'})
+        responses.add(responses.GET, 'https://example.com/', status=304)
+
+        self.get('https://example.com/')
+        self.assertEqual(self.get('https://example.com/').json(), {'a': 2})
+        self.assertEqual(self.get('https://example.com/').json(), {'a': 2})
+        self.assertEqual(
+            responses.calls[2].request.headers['If-Modified-Since'],
+            'Thu, 22 Oct 2015 07:28:00 GMT')
+
+    @responses.activate
+    def test_credentials(self):
+        responses.add(
+            responses.GET, 'https://example.com/', json={},
+            headers={'ETag': '"abc"'})
+
+        self.get('https://example.com/', auth=('alice', 'secret'))
+        self.get('https://example.com/', auth=('bob', 'secret'))
+
+        self.assertNotIn('If-None-Match', responses.calls[1].request.headers)
+
+
+class TestRateLimit(unittest.TestCase):
+    def setUp(self):
+        self.config = config.BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.set('general', 'http_pool_size', '4')
+        sessions.configure(self.config, 'general')
+
+    def tearDown(self):
+        sessions.configure(self.config, 'nosection')
+
+    def get_limiter(self, **kwargs):
+        request = requests.Request('GET', 'https://example.com/', **kwargs)
+        return sessions.get_adapter().get_limiter(request.prepare())
+
+    @responses.activate
+    def test_retry_after(self):
+        responses.add(
+            responses.GET, 'https://example.com/', status=403,
+            headers={'Retry-After': '0'})
+        responses.add(responses.GET, 'https://example.com/', json={})
+        response = sessions.get_session().get('https://example.com/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(self.get_limiter().concurrency, 3)
+
+    @responses.activate
+    def test_reset_too_late(self):
+        responses.add(
+            responses.GET, 'https://example.com/', status=403,
+            headers={
+                'X-RateLimit-Remaining': '0',
+                'X-RateLimit-Reset': str(int(time.time()) + 3600),
+            })
+        response = sessions.get_session().get('https://example.com/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_forbidden(self):
+        responses.add(responses.GET, 'https://example.com/', status=403)
+        response = sessions.get_session().get('https://example.com/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(self.get_limiter().concurrency, 4)
+
+    @responses.activate
+    def test_credentials(self):
+        responses.add(
+            responses.GET, 'https://example.com/', status=403,
+            headers={'Retry-After': '0'})
+        responses.add(responses.GET, 'https://example.com/', json={})
+        session = sessions.get_session()
+        session.get('https://example.com/', auth=('alice', 'secret'))
+
+        self.assertEqual(
+            self.get_limiter(auth=('alice', 'secret')).concurrency, 3)
+        self.assertEqual(
+            self.get_limiter(auth=('bob', 'secret')).concurrency, 4)
+
+    @responses.activate
+    def test_low_remaining(self):
+        reset = time.time() + 10
+        responses.add(
+            responses.GET, 'https://example.com/', json={},
+            headers={
+                'RateLimit-Remaining': '5',
+                'RateLimit-Reset': str(int(reset)),
+            })
+        sessions.get_session().get('https://example.com/')
+
+        limiter = self.get_limiter()
+        self.assertEqual(limiter.concurrency, 1)
+        self.assertEqual(limiter.remaining, 5)
+        self.assertEqual(limiter.reset, int(reset))
+
+        # The five requests left are spread until the reset.
+        limiter.acquire()
+        self.assertAlmostEqual(
+            limiter.get_delay(time.time()), (int(reset) - time.time()) / 5,
+            delta=0.1)
+
+    def test_exhausted(self):
+        limiter = self.get_limiter()
+        limiter.remaining = 0
+        limiter.reset = time.time() + 30
+        self.assertAlmostEqual(
+            limiter.get_delay(time.time()), 30, delta=0.1)
+
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """ Answers every request with a rate limit error. """
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        self.send_response(429)
+        self.send_header('Retry-After', '2')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRateLimitServer(unittest.TestCase):
+    def setUp(self):
+        RateLimitedHandler.requests = 0
+        self.server = HTTPServer(('127.0.0.1', 0), RateLimitedHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = 'http://127.0.0.1:%i/' % self.server.server_port
+
+        self.config = config.BugwarriorConfigParser()
+        self.config.add_section('general')
+        self.config.set('general', 'http_pool_size', '4')
+        self.config.set('general', 'http_rate_limit_wait', '1')
+        sessions.configure(self.config, 'general')
+
+    def tearDown(self):
+        sessions.configure(self.config, 'nosection')
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retry_after_too_long(self):
+        start = time.time()
+        response = sessions.get_session().get(self.url)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(RateLimitedHandler.requests, 1)
+
+        limiter = sessions.get_adapter().get_limiter(response.request)
+        self.assertEqual(limiter.concurrency, 2)
@@ -0,0 +1,169 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from bugwarrior import taskstore
+
+PENDING = (
+    b'[description:"Some \\"issue\\" &open;1&close;" entry:"1600000000" '
+    b'githuburl:"https:\\/\\/example.com\\/1" githubnumber:"1" '
+    b'status:"pending" uuid:"00000000-0000-0000-0000-000000000000"]\n'
+    b'[description:"githuburl:\\"https:\\/\\/example.com\\/2\\"" '
+    b'status:"pending" uuid:"00000000-0000-0000-0000-000000000001"]\n'
+)
+COMPLETED = (
+    b'[description:"D\xc3\xa9j\xc3\xa0 vu" githubnumber:"3" '
+    b'githuburl:"https:\\/\\/example.com\\/3" status:"completed" '
+    b'uuid:"00000000-0000-0000-0000-000000000002"]\n'
+)
+
+
+class TestParseTaskLine(unittest.TestCase):
+    def setUp(self):
+        self.pattern = taskstore.get_field_pattern(
+            ['uuid', 'status', 'description', 'githuburl', 'githubnumber'])
+
+    def test_parse(self):
+        record = taskstore.parse_task_line(
+            PENDING.splitlines()[0], self.pattern, numeric=['githubnumber'])
+        self.assertEqual(record, {
+            'description': 'Some "issue" [1]',
+            'githuburl': 'https://example.com/1',
+            'githubnumber': 1.0,
+            'status': 'pending',
+            'uuid': '00000000-0000-0000-0000-000000000000',
+        })
+
+    def test_names_within_values_are_ignored(self):
+        record = taskstore.parse_task_line(
+            PENDING.splitlines()[1], self.pattern)
+        self.assertNotIn('githuburl', record)
+        self.assertEqual(
+            record['description'], 'githuburl:"https://example.com/2"')
+
+    def test_unrequested_fields_are_skipped(self):
+        record = taskstore.parse_task_line(
+            PENDING.splitlines()[0], taskstore.get_field_pattern(['uuid']))
+        self.assertEqual(list(record), ['uuid'])
+
+
+class TestReadTasks(unittest.TestCase):
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp(prefix='bugwarrior')
+        for filename, content in [
+                ('pending.data', PENDING), ('completed.data', COMPLETED)]:
+            with open(os.path.join(self.data_path, filename), 'wb') as f:
+                f.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path, ignore_errors=True)
+
+    def assertTasks(self, **kwargs):
+        records = list(taskstore.read_tasks(
+            self.data_path, ['githuburl'], **kwargs))
+        self.assertEqual(
+            [record['uuid'][-1] for record in records], ['0', '1', '2'])
+        self.assertEqual(records[2], {
+            'description': u'D\xe9j\xe0 vu',
+            'githuburl': 'https://example.com/3',
+            'status': 'completed',
+            'uuid': '00000000-0000-0000-0000-000000000002',
+        })
+
+    def test_read(self):
+        self.assertTasks()
+
+    def test_read_mmap(self):
+        self.assertTasks(use_mmap=True)
+
+    def test_signature(self):
+        signature = taskstore.get_signature(self.data_path)
+        self.assertEqual(taskstore.get_signature(self.data_path), signature)
+
+        with open(os.path.join(self.data_path, 'pending.data'), 'ab') as f:
+            f.write(b'[description:"New task" status:"pending"]\n')
+        self.assertNotEqual(taskstore.get_signature(self.data_path), signature)
+
+    def test_missing_files(self):
+        os.remove(os.path.join(self.data_path, 'completed.data'))
+        open(os.path.join(self.data_path, 'pending.data'), 'w').close()
+        self.assertEqual(list(taskstore.read_tasks(
+            self.data_path, ['githuburl'], use_mmap=True)), [])
+
+
+class TestReadTaskChampionTasks(unittest.TestCase):
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp(prefix='bugwarrior')
+        self.path = os.path.join(self.data_path, taskstore.TASKCHAMPION_DB)
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            'CREATE TABLE tasks (uuid STRING PRIMARY KEY, data STRING)')
+        for uuid, data in [
+            ('00000000-0000-0000-0000-000000000000', {
+                'description': 'Some issue',
+                'status': 'pending',
+                'entry': '1600000000',
+                'githuburl': 'https://example.com/1',
+                'githubnumber': '1',
+                'annotation_1600000000': 'Some comment',
+            }),
+            ('00000000-0000-0000-0000-000000000001', {
+                'description': 'Some deleted issue',
+                'status': 'deleted',
+                'githuburl': 'https://example.com/2',
+            }),
+            ('00000000-0000-0000-0000-000000000002', {
+                'description': 'Some closed issue',
+                'status': 'completed',
+            }),
+        ]:
+            connection.execute(
+                'INSERT INTO tasks VALUES (?, ?)', (uuid, json.dumps(data)))
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path, ignore_errors=True)
+
+    def test_get_taskchampion_path(self):
+        self.assertEqual(
+            taskstore.get_taskchampion_path(self.data_path), self.path)
+        os.remove(self.path)
+        self.assertIsNone(taskstore.get_taskchampion_path(self.data_path))
+
+    def test_read(self):
+        records = list(taskstore.read_taskchampion_tasks(
+            self.data_path, ['githuburl', 'githubnumber'],
+            numeric=['githubnumber']))
+        self.assertEqual(sorted(records, key=lambda r: r['uuid']), [{
+            'uuid': '00000000-0000-0000-0000-000000000000',
+            'description': 'Some issue',
+            'status': 'pending',
+            'githuburl': 'https://example.com/1',
+            'githubnumber': 1.0,
+        }, {
+            'uuid': '00000000-0000-0000-0000-000000000002',
+            'description': 'Some closed issue',
+            'status': 'completed',
+        }])
+
+    def test_signature(self):
+        signature = taskstore.get_signature(self.data_path)
+        connection = sqlite3.connect(self.path)
+        connection.execute('CREATE TABLE operations (id INTEGER PRIMARY KEY)')
+        connection.commit()
+        self.assertNotEqual(taskstore.get_signature(self.data_path), signature)
+
+        signature = taskstore.get_signature(self.data_path)
+        connection.execute('INSERT INTO operations VALUES (NULL)')
+        connection.commit()
+        connection.close()
+        self.assertNotEqual(taskstore.get_signature(self.data_path), signature)
+
+    def test_read_only(self):
+        os.chmod(self.path, 0o400)
+        self.assertEqual(len(list(taskstore.read_taskchampion_tasks(
+            self.data_path, []))), 2)
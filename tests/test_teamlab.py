@@ -48,7 +48,7 @@ class TestTeamlabIssue(AbstractServiceTest, ServiceTest):
         def get_url(*args):
             return arbitrary_url
 
-        with mock.patch.object(issue, 'get_issue_url', side_effect=get_url):
+        with mock.patch.object(type(issue), 'get_issue_url', side_effect=get_url):
             actual_output = issue.to_taskwarrior()
 
         self.assertEqual(actual_output, expected_output)
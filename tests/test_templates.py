@@ -1,3 +1,7 @@
+import pickle
+
+from bugwarrior.services import get_template_cache
+
 from .base import ServiceTest
 from .test_service import DumbIssue
 
@@ -22,6 +26,7 @@ class TestTemplates(ServiceTest):
             'templates': templates,
             'shorten': False,  # Arbitrary
             'add_tags': add_tags if add_tags else [],
+            'template_cache': get_template_cache('templates'),
         }
 
         issue = DumbIssue({}, origin)
@@ -93,3 +98,16 @@ class TestTemplates(ServiceTest):
         })
 
         self.assertEqual(record, expected_record)
+
+    def test_templates_are_compiled_once(self):
+        template_cache = get_template_cache('templates')
+        self.get_issue({'project': '{{ project }}'}).get_taskwarrior_record()
+        compiled = template_cache.compiled['{{ project }}']
+
+        self.get_issue({'project': '{{ project }}'}).get_taskwarrior_record()
+        self.assertIs(template_cache.compiled['{{ project }}'], compiled)
+
+    def test_pickled_template_cache(self):
+        template_cache = get_template_cache('templates', ['{{ project }}'])
+        self.assertIs(
+            pickle.loads(pickle.dumps(template_cache)), template_cache)